@@ -3,17 +3,51 @@
 # Copyright 2020 Jonathan Haigh <jonathanhaigh@gmail.com>
 # SPDX-License-Identifier: MIT
 
+__version__ = "0.0.1"
+
 import abc
 import argparse
+import asyncio
+import collections
+import collections.abc
+import contextlib
+import copy
+import ctypes
+import functools
+import hashlib
+import heapq
+import itertools
 import json
+import mmap
 import operator
 import os
+import pickle
 import re
+import select
 import shlex
+import stat
+import sys
+import tempfile
+import threading
+import types
 
 # Make argparse.FileType available in this module
 FileType = argparse.FileType
 
+_IDENTIFIER_RE = re.compile(r"(?:[A-Za-z_][0-9A-Za-z_]*)?")
+
+# Used by _decode_json_fields() to find the JSON values of fields.
+_JSON_WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+_scan_json = json.JSONDecoder().scan_once
+
+# The decoder used by JsonSources that aren't given one. See
+# set_json_decoder().
+_default_json_decoder = json.loads
+
+# The values that can be given for the "type" of config items specified in
+# JSON, which can't contain Python callables. See ConfigParser.add_configs().
+_JSON_SPEC_TYPES = {"str": str, "int": int, "float": float}
+
 
 # ------------------------------------------------------------------------------
 # Exceptions
@@ -130,7 +164,7 @@ NOT_GIVEN = _NotGiven()
 # ------------------------------------------------------------------------------
 
 
-class Namespace:
+class Namespace(metaclass=abc.ABCMeta):
     """
     An object to hold values of config items.
 
@@ -153,14 +187,186 @@ class Namespace:
     """
 
     def __str__(self):
-        return str(vars(self))
+        return str(_namespace_values(self))
 
     def __eq__(self, other):
-        return other.__class__ == self.__class__ and vars(other) == vars(self)
+        return isinstance(other, Namespace) and _namespace_values(
+            other
+        ) == _namespace_values(self)
 
     __repr__ = __str__
 
 
+class FrozenNamespace(Namespace):
+    """
+    An immutable snapshot of config values.
+
+    :class:`FrozenNamespace` objects are returned by
+    :meth:`ConfigParser.parse_config` when its ``frozen`` argument is
+    :data:`True`. Their attributes can't be set or deleted and container
+    values are converted to immutable equivalents: :class:`list` values
+    become :class:`tuple` objects, :class:`set` values become
+    :class:`frozenset` objects and :class:`dict` values become read-only
+    :class:`types.MappingProxyType` views. Tuples (including named tuples) are
+    left as they are. They can therefore be
+    shared between threads without locking or copying, as long as the
+    values of config items don't include other mutable objects.
+
+    When a :class:`ConfigParser` is in incremental mode, successive frozen
+    results share the value objects of config items that didn't need to be
+    recalculated.
+    """
+
+    def __init__(self, values=None):
+        for name, value in (values or {}).items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(
+            f"cannot set attribute '{name}' of a FrozenNamespace"
+        )
+
+    def __delattr__(self, name):
+        raise AttributeError(
+            f"cannot delete attribute '{name}' of a FrozenNamespace"
+        )
+
+    def __reduce__(self):
+        # MappingProxyType objects can't be pickled, so pickle the values as
+        # normal containers and freeze them again when unpickling.
+        return (_frozen_namespace_from_dict, (_thaw(vars(self)),))
+
+
+class _LazyValue:
+    # A config value that is only worked out when it is first needed.
+
+    __slots__ = ("_get_value", "_value")
+
+    def __init__(self, get_value):
+        self._get_value = get_value
+        self._value = NOT_GIVEN
+
+    def get(self):
+        if self._value is NOT_GIVEN:
+            self._value = self._get_value()
+        return self._value
+
+
+class _LazyValuesMixin:
+    # Mixin for Namespace classes that can hold _LazyValues as pending
+    # attributes. Each one is resolved and set as a normal attribute when it
+    # is first accessed. The only method is __getattr__ so that config items
+    # can have any dest; see _set_lazy_values() and _namespace_values().
+
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        # Only called when normal attribute lookup fails.
+        if name == "__pending_lazy_values__":
+            raise AttributeError(name)
+        pending = self.__pending_lazy_values__
+        if name not in pending:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
+        value = pending[name].get()
+        setattr(self, name, value)
+        pending.pop(name, None)
+        return value
+
+
+class _LazyNamespace(_LazyValuesMixin, Namespace):
+    def __reduce__(self):
+        # Pending values can't be pickled, so unpickle as a plain Namespace.
+        return (_namespace_from_dict, (_namespace_values(self),))
+
+
+class _SlotsNamespace:
+    # Base for Namespace classes generated for the config items of a
+    # ConfigParser, with a slot for each dest rather than a __dict__. See
+    # _make_slots_namespace_class().
+
+    __slots__ = ()
+    __dests__ = ()
+
+    __str__ = Namespace.__str__
+    __repr__ = Namespace.__repr__
+    __eq__ = Namespace.__eq__
+    __hash__ = None
+
+    def __reduce__(self):
+        # The generated classes can't be found by pickle, so unpickle as a
+        # plain Namespace.
+        return (_namespace_from_dict, (_namespace_values(self),))
+
+
+class _LazySlotsNamespace(_LazyValuesMixin, _SlotsNamespace):
+    __slots__ = ("__pending_lazy_values__",)
+
+
+Namespace.register(_SlotsNamespace)
+
+
+def _make_slots_namespace_class(dests, lazy=False):
+    dests = tuple(dict.fromkeys(dests))
+    base = _LazySlotsNamespace if lazy else _SlotsNamespace
+    # The slots can't have the same names as the attributes of the base
+    # class, so the internal attributes all have dunder names.
+    reserved = set(dir(base))
+    for dest in dests:
+        if dest in reserved:
+            raise ValueError(
+                f"config item dest '{dest}' can't be used with "
+                "namespace_slots=True"
+            )
+    return type(
+        "Namespace", (base,), {"__slots__": dests, "__dests__": dests}
+    )
+
+
+def _make_namespace(cls, values):
+    ns = cls()
+    if isinstance(ns, _LazyValuesMixin):
+        _set_lazy_values(ns, values)
+    else:
+        for name, value in values.items():
+            setattr(ns, name, value)
+    return ns
+
+
+def _set_lazy_values(ns, values):
+    # Set the values of a Namespace that uses _LazyValuesMixin, keeping
+    # _LazyValues as pending values.
+    pending = {}
+    for name, value in values.items():
+        if isinstance(value, _LazyValue):
+            pending[name] = value
+        else:
+            setattr(ns, name, value)
+    object.__setattr__(ns, "__pending_lazy_values__", pending)
+
+
+def _namespace_values(ns):
+    # Return a dict of the config values in a Namespace. This is a function
+    # rather than a method so that a config item's dest can't hide it.
+    if isinstance(ns, _LazyValuesMixin):
+        for name in list(ns.__pending_lazy_values__):
+            getattr(ns, name)
+    if isinstance(ns, _SlotsNamespace):
+        values = {}
+        for dest in ns.__dests__:
+            try:
+                values[dest] = getattr(ns, dest)
+            except AttributeError:
+                pass
+        return values
+    values = vars(ns)
+    if isinstance(ns, _LazyValuesMixin):
+        values = values.copy()
+        del values["__pending_lazy_values__"]
+    return values
+
+
 class ConfigMention:
     """
     A :class:`ConfigMention` object represents a single mention of a config
@@ -201,15 +407,18 @@ class Source(abc.ABC):
       :meth:`Source.__init__` will create ``actions`` and ``priority``
       attributes to make them available to subclass methods.
 
-      ``actions`` is a :class:`dict` with config item names as the keys and
-      :class:`Action` objects as the values. The :class:`Action` attributes
+      ``actions`` is a read-only mapping with config item names as the keys
+      and :class:`Action` objects as the values. It contains the config items
+      that were added to the :class:`ConfigParser` before the source was
+      added, and may be shared with other sources. The :class:`Action`
+      attributes
       that are most useful for source classes to use are:
 
       * ``name``: the name of the config item to which the :class:`Action`
         applies. The source class should use this to determine which
         :class:`Action` object corresponds with each config item mention in the
         source. The ``name`` atribute of an :class:`Action` has the same value
-        as the key in the ``actions`` :class:`dict`.
+        as the key in the ``actions`` mapping.
 
       * ``nargs``: this specifies the number of arguments/values that a config
         item should have when mentioned in the source.
@@ -267,6 +476,87 @@ class Source(abc.ABC):
             :noindex:
         """
 
+    def fingerprint(self):
+        """
+        Return a value that identifies the current inputs of the source.
+
+        Subclasses may override this method to allow a :class:`ConfigParser`
+        created with ``incremental=True`` to skip calling
+        :meth:`parse_config` for sources whose inputs have not changed since
+        the last parse. The returned value should compare equal to the value
+        returned by a previous call if and only if :meth:`parse_config` would
+        return the same mentions as it did then.
+
+        The default implementation returns :data:`None`, which means that the
+        source can't tell whether its inputs have changed and
+        :meth:`parse_config` is called for every parse.
+        """
+        return None
+
+    def watched_paths(self):
+        """
+        Return the paths of the files and directories that the source reads.
+
+        Subclasses that read files may override this method to allow a
+        :class:`ConfigWatcher` to wait for notifications of changes to the
+        paths from the operating system rather than checking the source's
+        :meth:`fingerprint` at regular intervals. A change to a file is
+        noticed if the path of the file or of its directory is returned.
+
+        The default implementation returns :data:`None`, which means that
+        changes to the source's inputs can't be watched. Sources whose inputs
+        never change can return an empty list.
+        """
+        return None
+
+    def persistent_fingerprint(self):
+        """
+        Return a value that identifies the current inputs and options of the
+        source, and that can be compared between processes.
+
+        Subclasses may override this method to allow the results of parses
+        that use the source to be cached on disk by a :class:`ConfigParser`
+        created with a ``cache_path``. The :func:`repr` of the returned value
+        is used in the key of the cache, so it should be equal to the
+        :func:`repr` of the value returned by a call in a previous run of the
+        program if and only if :meth:`parse_config` would return the same
+        mentions as it did then.
+
+        The default implementation returns :data:`None`, which means that
+        the results of parses that use the source can't be cached.
+        """
+        return None
+
+
+class AsyncSource(Source):
+    """
+    Abstract base for source classes whose :meth:`parse_config` method is a
+    coroutine.
+
+    Source classes that need to wait for slow I/O can inherit from
+    :class:`AsyncSource` rather than directly from :class:`Source`. Other than
+    :meth:`parse_config` being a coroutine, the requirements for
+    :class:`AsyncSource` subclasses are the same as for :class:`Source`
+    subclasses.
+
+    :meth:`ConfigParser.parse_config_async` awaits the :meth:`parse_config`
+    coroutines of all :class:`AsyncSource` sources concurrently.
+    :meth:`ConfigParser.parse_config` can also be used with
+    :class:`AsyncSource` sources, but it runs each coroutine to completion
+    in its own event loop, so it can't be used from a thread with a running
+    event loop.
+    """
+
+    @abc.abstractmethod
+    async def parse_config(self):
+        """
+        Read the values of config items for this source.
+
+        This is an abstract coroutine that subclasses must implement to return
+        a :class:`list` containing a :class:`ConfigMention` element for each
+        config item mentioned in the source. See :meth:`Source.parse_config`.
+        """
+
 
 class DictSource(Source):
     """
@@ -367,6 +657,18 @@ class DictSource(Source):
             mentions.append(ConfigMention(action, args, self.priority))
         return mentions
 
+    def fingerprint(self):
+        # Take a copy of list values so that changes made to them in place are
+        # noticed too.
+        return tuple(
+            (key, tuple(value) if isinstance(value, list) else value)
+            for key, value in self._dict.items()
+            if key in self.actions
+        )
+
+    def persistent_fingerprint(self):
+        return (self._none_values, self.fingerprint())
+
 
 class EnvironmentSource(Source):
     """
@@ -421,6 +723,19 @@ class EnvironmentSource(Source):
     * ``env_var_force_upper`` (optional, keyword): force the environment
       variable name to be in upper case. Default is ``True``.
 
+    * ``environ`` (optional, keyword): a mapping of environment variable names
+      to values to use instead of :data:`os.environ`. This can be an
+      :class:`EnvironmentSnapshot`, in which case a :class:`ConfigParser` in
+      incremental mode only reads the source again when it is given a
+      different snapshot. The default is to use :data:`os.environ` at the
+      time of each parse.
+
+    The mapping used by the source can be changed after it has been created
+    with :meth:`EnvironmentSource.set_environ`:
+
+    .. automethod:: EnvironmentSource.set_environ
+        :noindex:
+
     Note that:
 
     * Values in environment variables for config items with ``nargs == 0`` or
@@ -443,6 +758,7 @@ class EnvironmentSource(Source):
         priority=10,
         env_var_prefix="",
         env_var_force_upper=True,
+        environ=None,
     ):
         super().__init__(actions, priority=priority)
 
@@ -451,24 +767,88 @@ class EnvironmentSource(Source):
         self._none_values = none_values
         self._env_var_prefix = env_var_prefix
         self._env_var_force_upper = env_var_force_upper
+        self._environ = environ
+
+        # The environment variable name for each config item, and the
+        # (index, action) pairs for each environment variable name (more than
+        # one config item can have the same environment variable name when
+        # env_var_force_upper is True).
+        self._env_names = [
+            (self._config_name_to_env_name(action.name), action)
+            for action in self.actions.values()
+        ]
+        self._actions_by_env_name = {}
+        for index, (env_name, action) in enumerate(self._env_names):
+            self._actions_by_env_name.setdefault(env_name, []).append(
+                (index, action)
+            )
+
+    def set_environ(self, environ):
+        """
+        Set the mapping of environment variable names to values used by the
+        source. If ``environ`` is :data:`None`, :data:`os.environ` is used.
+        """
+        self._environ = environ
 
     def parse_config(self):
-        mentions = []
-        for action in self.actions.values():
-            env_name = self._config_name_to_env_name(action.name)
-            if env_name not in os.environ:
+        environ = self._get_environ()
+        # Look up each config item's environment variable or look at each
+        # environment variable, whichever means fewer lookups.
+        if len(environ) < len(self._env_names):
+            found = self._scan_environ(environ)
+        else:
+            found = self._probe_environ(environ)
+        return [
+            ConfigMention(
+                action,
+                _args_from_string(action, value, self._none_values),
+                self.priority,
+            )
+            for action, value in found
+        ]
+
+    def _probe_environ(self, environ):
+        for env_name, action in self._env_names:
+            value = environ.get(env_name)
+            if value is not None:
+                yield action, value
+
+    def _scan_environ(self, environ):
+        prefix = self._env_var_prefix
+        found = []
+        for env_name, value in environ.items():
+            if not env_name.startswith(prefix):
                 continue
-            value = os.environ[env_name]
-            if value in self._none_values and action.nargs in (0, "?", "*"):
-                args = []
-            elif action.nargs == 0:
-                raise InvalidValueForNargs0Error(value, self._none_values)
-            elif action.nargs is None or action.nargs in (1, "?"):
-                args = [value]
-            else:
-                args = shlex.split(value)
-            mentions.append(ConfigMention(action, args, self.priority))
-        return mentions
+            for index, action in self._actions_by_env_name.get(env_name, ()):
+                found.append((index, action, value))
+        # Keep the mentions in the same order as the config items.
+        found.sort(key=operator.itemgetter(0))
+        return [(action, value) for index, action, value in found]
+
+    def fingerprint(self):
+        environ = self._get_environ()
+        if isinstance(environ, EnvironmentSnapshot):
+            # Comparing snapshots is cheap unless they're different objects
+            # with the same version.
+            return (environ,)
+        return tuple(
+            environ.get(env_name) for env_name, action in self._env_names
+        )
+
+    def persistent_fingerprint(self):
+        environ = self._get_environ()
+        return (
+            self._none_values,
+            [
+                (env_name, environ.get(env_name))
+                for env_name, action in self._env_names
+            ],
+        )
+
+    def _get_environ(self):
+        if self._environ is None:
+            return os.environ
+        return self._environ
 
     def _config_name_to_env_name(self, config_name):
         if self._env_var_force_upper:
@@ -476,6 +856,55 @@ class EnvironmentSource(Source):
         return f"{self._env_var_prefix}{config_name}"
 
 
+class EnvironmentSnapshot(collections.abc.Mapping):
+    """
+    An immutable copy of a set of environment variables, for use as the
+    ``environ`` argument of the ``environment`` source.
+
+    ``environ`` is the mapping of environment variable names to values to
+    copy. The default is :data:`os.environ`.
+
+    :class:`EnvironmentSnapshot` objects have a ``version`` attribute
+    containing a hash of their contents. Snapshots with different
+    ``version`` values are never equal, so they can be compared cheaply.
+    """
+
+    def __init__(self, environ=None):
+        if environ is None:
+            environ = os.environ
+        self._environ = dict(environ)
+        self.version = hash(frozenset(self._environ.items()))
+
+    def __getitem__(self, name):
+        return self._environ[name]
+
+    def __iter__(self):
+        return iter(self._environ)
+
+    def __len__(self):
+        return len(self._environ)
+
+    def get(self, name, default=None):
+        return self._environ.get(name, default)
+
+    def items(self):
+        return self._environ.items()
+
+    def __hash__(self):
+        return self.version
+
+    def __eq__(self, other):
+        if isinstance(other, EnvironmentSnapshot):
+            return (
+                self.version == other.version
+                and self._environ == other._environ
+            )
+        return super().__eq__(other)
+
+    def __repr__(self):
+        return f"EnvironmentSnapshot({self._environ!r})"
+
+
 class ArgparseSource(Source):
     """
     Obtains config values from an :class:`argparse.ArgumentParser`.
@@ -675,17 +1104,36 @@ class SimpleArgparseSource(Source):
     ):
         super().__init__(actions, priority=priority)
         self._argparse_source = ArgparseSource(actions, priority=priority)
-        self._argparse_parser = argument_parser_class(**kwargs)
-        self._argparse_source.add_configs_to_argparse_parser(
-            self._argparse_parser
-        )
+        self._argument_parser_class = argument_parser_class
+        self._argument_parser_kwargs = kwargs
+        # The argparse parser is only created when it's needed, which may be
+        # never if parse results are cached (see ConfigParser's cache_path).
+        self._argparse_parser = None
 
     def parse_config(self):
+        if self._argparse_parser is None:
+            argparse_parser = self._argument_parser_class(
+                **self._argument_parser_kwargs
+            )
+            self._argparse_source.add_configs_to_argparse_parser(
+                argparse_parser
+            )
+            self._argparse_parser = argparse_parser
         self._argparse_source.notify_parsed_args(
             self._argparse_parser.parse_args()
         )
         return self._argparse_source.parse_config()
 
+    def fingerprint(self):
+        return tuple(sys.argv)
+
+    def persistent_fingerprint(self):
+        return (
+            _stable_repr(self._argument_parser_class),
+            _stable_repr(self._argument_parser_kwargs),
+            sys.argv,
+        )
+
 
 class JsonSource(Source):
     """
@@ -741,8 +1189,37 @@ class JsonSource(Source):
       strings) that are decoded into Python values and added to
       ``none_values``.  The default ``json_none_values`` is ``["null"]``.
 
+    * ``reread`` (optional, keyword): if :data:`True`, the file given by
+      ``path`` is read and decoded every time the config is parsed. If
+      :data:`False`, the decoded data is reused until the file's modification
+      time, size or inode number changes. The default is :data:`False`.
+
+      Unless ``reread`` is :data:`True`, decoded data is also kept in a cache
+      shared by all ``json`` sources in the process, so sources that read the
+      same unchanged file only decode it once. See
+      :func:`set_json_cache_size`.
+
+    * ``selective`` (optional, keyword): if :data:`True`, only the values of
+      fields of the top-level JSON object that are the names of config items
+      are kept. The values of other fields are dropped as soon as they have
+      been scanned, so only the config values are kept in memory (including
+      in the shared cache), which helps with large files that contain a lot of
+      other data. This is about as fast as decoding the whole file. The
+      default is :data:`False`.
+
+    * ``decoder`` (optional, keyword): a callable with the same semantics as
+      :func:`json.loads` used to decode the JSON data and the
+      ``json_none_values``. This allows a faster JSON decoder to be used. The
+      default is the decoder set by :func:`set_json_decoder` when the source
+      is created, which is initially :func:`json.loads`.
+
     Notes:
 
+    * The JSON data is not read until the config is parsed, so errors reading
+      or decoding it are raised by :meth:`ConfigParser.parse_config` rather
+      than by :meth:`ConfigParser.add_source`. Data from ``fileobj`` is only
+      read once.
+
     * The data in the JSON file should be a JSON object. Each config item value
       should be assigned to a field of the object that has the same name as the
       config item.
@@ -772,6 +1249,9 @@ class JsonSource(Source):
         none_values=None,
         json_none_values=None,
         priority=0,
+        reread=False,
+        selective=False,
+        decoder=None,
     ):
         super().__init__(actions, priority=priority)
         if path and fileobj:
@@ -785,24 +1265,279 @@ class JsonSource(Source):
         if json_none_values is None:
             json_none_values = ["null"]
 
-        values_dict = self._get_json(path, fileobj)
-        self._dict_source = DictSource(
-            actions,
+        self._path = path
+        self._fileobj = fileobj
+        self._reread = reread
+        self._selective = selective
+        if decoder is None:
+            decoder = _default_json_decoder
+        self._decoder = decoder
+        self._none_values = [
+            decoder(v) for v in json_none_values
+        ] + none_values
+
+        # The file stat key and DictSource for the last data read.
+        self._loaded = None
+
+    def parse_config(self):
+        return self._get_dict_source().parse_config()
+
+    def fingerprint(self):
+        if not self._path:
+            # A file object is only read once, so the mentions found by the
+            # source never change.
+            return ()
+        if self._reread:
+            return None
+        return self._stat_key()
+
+    def watched_paths(self):
+        if not self._path:
+            return []
+        return [self._path]
+
+    def persistent_fingerprint(self):
+        if not self._path:
+            return None
+        stat_key = self._stat_key()
+        if stat_key is None:
+            return None
+        return (
+            os.path.abspath(self._path),
+            stat_key,
+            self._none_values,
+            self._selective,
+            _stable_repr(self._decoder),
+        )
+
+    def _get_dict_source(self):
+        if not self._path:
+            if self._loaded is None:
+                values_dict = self._decode(self._fileobj.read())
+                self._loaded = (None, self._dict_source(values_dict))
+            return self._loaded[1]
+
+        # Stat the file before reading it so that changes made while it's
+        # being read are noticed next time.
+        stat_key = None if self._reread else self._stat_key()
+        if (
+            self._loaded is None
+            or stat_key is None
+            or self._loaded[0] != stat_key
+        ):
+            values_dict = self._load_path(stat_key)
+            self._loaded = (stat_key, self._dict_source(values_dict))
+        return self._loaded[1]
+
+    def _load_path(self, stat_key):
+        if stat_key is None:
+            return self._read_path()
+        names = frozenset(self.actions) if self._selective else None
+        key = (os.path.realpath(self._path), stat_key, names, self._decoder)
+        values_dict = _json_file_cache.get(key)
+        if values_dict is None:
+            values_dict = self._read_path()
+            # The size of the file is a cheap estimate of the memory used by
+            # the decoded data.
+            _json_file_cache.put(key, values_dict, stat_key[1])
+        return values_dict
+
+    def _read_path(self):
+        with mapped_file(self._path) as view:
+            return self._decode(str(view, "utf-8"))
+
+    def _decode(self, s):
+        if self._selective:
+            return _decode_json_fields(s, self.actions, self._decoder)
+        return self._decoder(s)
+
+    def _dict_source(self, values_dict):
+        return DictSource(
+            self.actions,
             values_dict,
-            none_values=[json.loads(v) for v in json_none_values]
-            + none_values,
+            none_values=self._none_values,
+            priority=self.priority,
         )
 
+    def _stat_key(self):
+        try:
+            st = os.stat(self._path)
+        except OSError:
+            # Let the error be raised when the file is read.
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class DirectorySource(Source):
+    """
+    Obtains config values from a directory containing a file for each config
+    item, like the volumes that Kubernetes creates for ConfigMaps and Secrets.
+
+    Do not create :class:`DirectorySource` objects directly, add them to a
+    :class:`ConfigParser` object using :meth:`ConfigParser.add_source`. For
+    example:
+
+    .. code-block:: python
+
+        # For demonstration purposes, create files for some config items
+        pathlib.Path("/etc/my_app/config_item1").write_text("v1\\n")
+        pathlib.Path("/etc/my_app/config_item2").write_text("1 2")
+        pathlib.Path("/etc/my_app/config_item3").write_text("")
+
+        parser = multiconfparse.ConfigParser()
+        parser.add_config("config_item1")
+        parser.add_config("config_item2", nargs=2, type=int)
+        parser.add_config("config_item3", action="store_true")
+        parser.add_source("directory", "/etc/my_app")
+        parser.parse_config()
+        # -> multiconfparse.Namespace {
+        #   "config_item1": "v1",
+        #   "config_item2": [1, 2],
+        #   "config_item3": True,
+        # }
+
+    The arguments of :meth:`ConfigParser.add_source` for the ``directory``
+    source are:
+
+    * ``source`` (required, positional): ``"directory"``
+
+    * ``path`` (required, positional): the path of the directory.
+
+    * ``none_values`` (optional, keyword): a list of values that, when seen in
+      files, should be treated as if they were not present (i.e. values for
+      config items with ``nargs == 0`` or ``nargs == "?"`` (where the
+      ``const`` value should be used rather than the value from the file).
+      The default ``none_values`` is ``[""]``.
+
+    * ``priority`` (optional, keyword): The priority for the source. The
+      default priority for a ``directory`` source is ``0``.
+
+    * ``strip`` (optional, keyword): if :data:`True`, leading and trailing
+      whitespace (including a final newline) is removed from the contents of
+      files. The default is :data:`True`.
+
+    Notes:
+
+    * The name of the file for a config item is the config item's name. Files
+      whose names aren't the names of config items are ignored, as are
+      subdirectories.
+
+    * Files are read as UTF-8 text. The contents of files for config items
+      with ``nargs >= 2``, ``nargs == "+"`` or ``nargs == "*"`` are split into
+      arguments by :func:`shlex.split`, like the values of environment
+      variables for the ``environment`` source.
+
+    * If the directory contains a ``..data`` symbolic link (as Kubernetes
+      volumes do), the files are read from the directory it points to. The
+      link is only resolved once per parse, so all of the values found by a
+      parse come from the same version of the files even if the link is
+      changed during the parse.
+
+    * A file is only read again if its inode number, modification time or
+      size has changed since the last parse.
+    """
+
+    source_name = "directory"
+
+    def __init__(
+        self, actions, path, none_values=None, priority=0, strip=True,
+    ):
+        super().__init__(actions, priority=priority)
+        if none_values is None:
+            none_values = [""]
+        self._path = path
+        self._none_values = none_values
+        self._strip = strip
+
+        # The stat key and value of each file read by the last parse.
+        self._file_cache = {}
+
     def parse_config(self):
-        return self._dict_source.parse_config()
+        # The files may be removed if the ..data link is changed during the
+        # parse, so try again with the new link target if that happens.
+        attempts = 3
+        for attempt in range(attempts):
+            try:
+                return self._read_files()
+            except FileNotFoundError:
+                if attempt == attempts - 1:
+                    raise
+
+    def fingerprint(self):
+        try:
+            return tuple(
+                (path, stat_key) for action, path, stat_key in self._files()
+            )
+        except FileNotFoundError:
+            return None
+
+    def watched_paths(self):
+        # Swapping the ..data link changes the directory itself.
+        return [self._path]
+
+    def persistent_fingerprint(self):
+        fingerprint = self.fingerprint()
+        if fingerprint is None:
+            return None
+        return (
+            os.path.abspath(self._path),
+            self._none_values,
+            self._strip,
+            fingerprint,
+        )
 
-    @staticmethod
-    def _get_json(path, fileobj):
-        if path:
-            with open(path, mode="r") as f:
-                return json.load(f)
-        else:
-            return json.load(fileobj)
+    def _read_files(self):
+        mentions = []
+        file_cache = {}
+        for action, path, stat_key in self._files():
+            cached = self._file_cache.get(path)
+            if cached is not None and cached[0] == stat_key:
+                value = cached[1]
+            else:
+                value = self._read_file(path)
+            file_cache[path] = (stat_key, value)
+            args = _args_from_string(action, value, self._none_values)
+            mentions.append(ConfigMention(action, args, self.priority))
+        self._file_cache = file_cache
+        return mentions
+
+    def _read_file(self, path):
+        with open(path, mode="r", encoding="utf-8") as f:
+            value = f.read()
+        if self._strip:
+            value = value.strip()
+        return value
+
+    def _files(self):
+        # Return (action, path, stat key) tuples for the config items that
+        # have files, in the same order as the config items.
+        with os.scandir(self._data_dir()) as it:
+            entries = {entry.name: entry for entry in it}
+        files = []
+        for name, action in self.actions.items():
+            entry = entries.get(name)
+            if entry is None:
+                continue
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                if entry.is_symlink():
+                    # A broken symbolic link.
+                    continue
+                # The file has been removed since the directory was listed,
+                # e.g. because the ..data link has been changed, so let
+                # parse_config() try again.
+                raise
+            if stat.S_ISREG(st.st_mode):
+                stat_key = (st.st_ino, st.st_mtime_ns, st.st_size)
+                files.append((action, entry.path, stat_key))
+        return files
+
+    def _data_dir(self):
+        data_link = os.path.join(self._path, "..data")
+        if os.path.islink(data_link):
+            return os.path.realpath(data_link)
+        return self._path
 
 
 class Action(abc.ABC):
@@ -950,7 +1685,7 @@ class Action(abc.ABC):
         self._set_type(type, nargs)
         self.required = required
         self.default = default
-        self.choices = choices
+        self._set_choices(choices)
         self.help = help
         self.include_sources = include_sources
         self.exclude_sources = exclude_sources
@@ -965,6 +1700,88 @@ class Action(abc.ABC):
         self._validate_choices_for_mention(mention)
         self.__call__(namespace, mention.args)
 
+    def _compile_accumulator(self):
+        # Return a function equivalent to accumulate_mention() that has the
+        # nargs, type and choices checks specialized for this action so that
+        # they don't have to be worked out again for every mention.
+        #
+        # Subclasses that customize how mentions are processed keep using
+        # their own accumulate_mention().
+        if self._has_custom_mention_processing():
+            return self._accumulate_mention_copy
+
+        nargs = 1 if self.nargs is None else self.nargs
+        expected_len = nargs if isinstance(nargs, int) else None
+        require_args = nargs == "+"
+        coerce = self.type if nargs != 0 else None
+        check_choices = None
+        if self.choices is not None:
+            check_choices = self._check_choices
+        call = self.__call__
+
+        def accumulate(namespace, mention):
+            args = mention.args
+            if expected_len is not None and len(args) != expected_len:
+                raise InvalidNumberOfValuesError(self)
+            if require_args and not args:
+                raise InvalidNumberOfValuesError(self)
+            if coerce is not None:
+                args = [coerce(a) for a in args]
+            if check_choices is not None:
+                check_choices(args)
+            call(namespace, args)
+
+        return accumulate
+
+    def _compile_lazy_accumulator(self):
+        # Return a function like the one returned by _compile_accumulator(),
+        # but which only checks the number of arguments straight away. It
+        # stores a _LazyValue for the config item that does the type
+        # conversion, choices validation and __call__() when it's needed.
+        #
+        # This only makes sense for config items with values that depend
+        # only on the highest priority mention.
+        accumulate = self._compile_accumulator()
+
+        def get_value(mention):
+            namespace = Namespace()
+            accumulate(namespace, mention)
+            return getattr(namespace, self.dest)
+
+        def accumulate_lazily(namespace, mention):
+            self._check_nargs_for_mention(mention)
+            lazy_value = _LazyValue(functools.partial(get_value, mention))
+            setattr(namespace, self.dest, lazy_value)
+
+        return accumulate_lazily
+
+    def _accumulate_mention_copy(self, namespace, mention):
+        # accumulate_mention() may modify the mention it is given, but the
+        # mentions found by sources may be reused by later parses.
+        mention = ConfigMention(
+            mention.action, list(mention.args), mention.priority
+        )
+        self.accumulate_mention(namespace, mention)
+
+    def _last_mention_wins(self):
+        # Return whether the value of the config item only depends on its
+        # highest priority mention, i.e. whether __call__() ignores any
+        # existing value. Lower priority mentions of such config items don't
+        # need to be processed when ConfigParser isn't in strict mode.
+        return False
+
+    def _has_custom_mention_processing(self):
+        cls = type(self)
+        return any(
+            getattr(cls, attr) is not getattr(Action, attr)
+            for attr in (
+                "accumulate_mention",
+                "_check_nargs_for_mention",
+                "_coerce_types_for_mention",
+                "_validate_choices_for_mention",
+            )
+        )
+
     @abc.abstractmethod
     def __call__(self, namespace, args):
         """
@@ -1030,9 +1847,7 @@ class Action(abc.ABC):
 
     @staticmethod
     def _is_python_identifier(name):
-        return not re.search(r"[^0-9A-Za-z_]", name) and not re.search(
-            r"^[^a-zA-Z_]", name
-        )
+        return _IDENTIFIER_RE.fullmatch(name) is not None
 
     def _set_name(self, name):
         if not self._is_python_identifier(name):
@@ -1062,6 +1877,32 @@ class Action(abc.ABC):
             raise TypeError("'type' argument must be callable")
         self.type = type
 
+    def _set_choices(self, choices):
+        self.choices = choices
+        # Index the choices so that checking an argument doesn't need a linear
+        # search of a list of choices. Only the built-in collection types are
+        # indexed: other collections (e.g. str, range and user defined
+        # containers) keep their own "in" behaviour. range objects already
+        # check int arguments without searching.
+        self._hashable_choices = None
+        self._unhashable_choices = ()
+        if type(choices) not in (list, tuple, set, frozenset):
+            return
+        try:
+            self._hashable_choices = frozenset(choices)
+        except TypeError:
+            hashable = []
+            unhashable = []
+            for choice in choices:
+                try:
+                    hash(choice)
+                except TypeError:
+                    unhashable.append(choice)
+                else:
+                    hashable.append(choice)
+            self._hashable_choices = frozenset(hashable)
+            self._unhashable_choices = tuple(unhashable)
+
     def _check_nargs_for_mention(self, mention):
         if (
             (isinstance(self.nargs, int) and len(mention.args) != self.nargs)
@@ -1076,10 +1917,32 @@ class Action(abc.ABC):
     def _validate_choices_for_mention(self, mention):
         if self.choices is None:
             return
-        for arg in mention.args:
-            if arg not in self.choices:
+        self._check_choices(mention.args)
+
+    def _check_choices(self, args):
+        if self._hashable_choices is not None:
+            # Check all of the arguments in one go in the common case where
+            # they're all valid.
+            try:
+                if self._hashable_choices.issuperset(args):
+                    return
+            except TypeError:
+                # One of the arguments isn't hashable.
+                pass
+        for arg in args:
+            if not self._is_valid_choice(arg):
                 raise InvalidChoiceError(self, arg)
 
+    def _is_valid_choice(self, arg):
+        if self._hashable_choices is None:
+            return arg in self.choices
+        try:
+            if arg in self._hashable_choices:
+                return True
+        except TypeError:
+            pass
+        return arg in self._unhashable_choices
+
 
 class StoreAction(Action):
     """
@@ -1145,6 +2008,12 @@ class StoreAction(Action):
         else:
             setattr(namespace, self.dest, args)
 
+    def _last_mention_wins(self):
+        return (
+            type(self).__call__ is StoreAction.__call__
+            and not self._has_custom_mention_processing()
+        )
+
     def _set_nargs(self, nargs):
         super()._set_nargs(nargs)
         if self.nargs == 0:
@@ -1213,6 +2082,12 @@ class StoreConstAction(Action):
         assert not args
         setattr(namespace, self.dest, self.const)
 
+    def _last_mention_wins(self):
+        return (
+            type(self).__call__ is StoreConstAction.__call__
+            and not self._has_custom_mention_processing()
+        )
+
 
 class StoreTrueAction(StoreConstAction):
     """
@@ -1572,6 +2447,70 @@ class ConfigParser:
       Set ``config_default`` to :const:`SUPPRESS` to prevent
       these configs from having an attribute set in the :class:`Namespace` at
       all.
+
+    * ``incremental``: if :data:`True`, remember the mentions found in each
+      source and the resulting config values between parses. When the config
+      is parsed again, only sources whose :meth:`Source.fingerprint` has
+      changed are read again and only the config items mentioned by those
+      sources are recalculated. The default is :data:`False`.
+
+      Each :class:`Namespace` returned in incremental mode has its own copies
+      of :class:`list`, :class:`set` and :class:`dict` values, so changing
+      them doesn't affect later parses. Results of parses with
+      ``frozen=True`` share the values of config items that haven't changed.
+
+    * ``strict``: if :data:`True` (the default), every mention of every
+      config item is checked for a valid number of arguments, converted to
+      the config item's ``type`` and checked against its ``choices``. If
+      :data:`False`, for config items whose final value only depends on their
+      highest priority mention (i.e. config items with the ``store``,
+      ``store_const``, ``store_true`` and ``store_false`` actions), only that
+      mention is checked and converted. This can save a lot of work when
+      ``type`` conversions are expensive, but errors in lower priority
+      mentions of those config items are not reported.
+
+    * ``lazy_types``: if :data:`True`, the ``type`` conversion and
+      ``choices`` validation of the highest priority mention of config items
+      with the ``store`` action is not done during the parse. Instead, it is
+      done when the config item's attribute of the returned
+      :class:`Namespace` is first accessed, and the result is kept for later
+      accesses. Exceptions raised by the conversion or validation (e.g.
+      :class:`InvalidChoiceError`) are raised by the attribute access. The
+      default is :data:`False`. ``lazy_types`` can only be used when
+      ``strict`` is :data:`False`.
+
+    * ``namespace_slots``: if :data:`True`, return config values in objects
+      of a :class:`Namespace` subclass that is generated for the config items
+      of the :class:`ConfigParser` and has a ``__slots__`` entry for each
+      config item ``dest`` rather than a ``__dict__``. This uses less memory
+      per object, which helps when keeping many results of
+      :meth:`parse_config` at once. Config values can be read, set and
+      compared just like with a plain :class:`Namespace`, but attributes can't
+      be added for names other than the config items' ``dest`` values.
+      Config items can't have ``dest`` values that are the names of dunder
+      attributes of the generated class, like ``__eq__``; :exc:`ValueError` is
+      raised when parsing if they do. The default is :data:`False`.
+
+    * ``cache_path``: the path of a file in which to cache the results of
+      :meth:`parse_config` and :meth:`partially_parse_config`, so that later
+      runs of the program can skip the parse if nothing that affects its
+      result has changed. The cache is keyed by the version of
+      :mod:`multiconfparse`, the config items and their options, and the
+      :meth:`Source.persistent_fingerprint` of each source (e.g. the file
+      status of ``json`` sources, the relevant environment variables of
+      ``environment`` sources and the command line for ``simple_argparse``
+      sources). Parses that use sources that don't support
+      :meth:`Source.persistent_fingerprint` (like ``argparse`` sources),
+      that have config values that can't be pickled, or whose parser has
+      ``lazy_types`` enabled are not cached.
+
+      Functions (e.g. ``type`` arguments) are identified in the key by their
+      qualified names, code, default arguments and closures. Classes and
+      other callables are only identified by their qualified names or
+      :func:`repr`, so the cache file should be deleted if their code is
+      changed. The cache file is read with :mod:`pickle`, so it
+      must not be writable by untrusted users. The default is :data:`None`,
+      which means that results are not cached.
     """
 
     class ValueWithPriority:
@@ -1584,11 +2523,31 @@ class ConfigParser:
 
         __repr__ = __str__
 
-    def __init__(self, config_default=NOT_GIVEN):
+    def __init__(
+        self,
+        config_default=NOT_GIVEN,
+        incremental=False,
+        strict=True,
+        lazy_types=False,
+        namespace_slots=False,
+        cache_path=None,
+    ):
+        if strict and lazy_types:
+            raise ValueError("lazy_types cannot be used in strict mode")
         self._actions = {}
+        self._action_indexes = {}
+        self._actions_view = None
         self._sources = []
         self._parsed_values = {}
         self._global_default = config_default
+        self._incremental = incremental
+        self._strict = strict
+        self._lazy_types = lazy_types
+        self._namespace_slots = namespace_slots
+        self._cache_path = cache_path
+        self._plan = None
+        # The subscriptions (see subscribe()) for each dest.
+        self._subscriptions = {}
 
     def add_config(self, name, **kwargs):
         """
@@ -1751,12 +2710,83 @@ class ConfigParser:
         """
         if name in self._actions:
             raise ValueError(f"Config item with name '{name}' already exists")
-        if "default" not in kwargs and self._global_default is not NOT_GIVEN:
-            kwargs["default"] = self._global_default
-        action = Action.create(name=name, **kwargs)
+        action = self._create_action(name, kwargs)
+        self._action_indexes[name] = len(self._actions)
         self._actions[name] = action
+        self._plan = None
         return action
 
+    def add_configs(self, spec, type_names=None):
+        """
+        Add many config items to the :class:`ConfigParser` at once.
+
+        ``spec`` specifies the config items and can be:
+
+        * a mapping from the names of config items to :class:`dict` objects
+          containing the other arguments that would be given to
+          :meth:`add_config` for the config items;
+
+        * an iterable of :class:`dict` objects containing the arguments that
+          would be given to :meth:`add_config`, including ``name``;
+
+        * the path of a JSON file containing an object or array in one of the
+          above forms.
+
+        Because JSON can't contain Python callables, a ``type`` argument that
+        is a :class:`str` is looked up by name. The names ``"str"``, ``"int"``
+        and ``"float"`` can always be used. Other names can be made available
+        by passing a mapping from names to types as the ``type_names``
+        argument.
+
+        The config items are either all added or, if any of them is invalid,
+        none of them are added.
+
+        This is a convenience for declaring config items from a schema. Each
+        config item is created in the same way as by :meth:`add_config`, so
+        it isn't faster than calling :meth:`add_config` for each item.
+
+        Returns: a :class:`list` of the :class:`Action` objects created for the
+        config items.
+        """
+        if isinstance(spec, (str, os.PathLike)):
+            with open(spec, mode="r") as f:
+                spec = json.load(f)
+        if isinstance(spec, collections.abc.Mapping):
+            spec = (
+                dict(kwargs, name=name) for name, kwargs in spec.items()
+            )
+        type_names = dict(_JSON_SPEC_TYPES, **(type_names or {}))
+
+        new_actions = {}
+        for kwargs in spec:
+            kwargs = dict(kwargs)
+            if "name" not in kwargs:
+                raise ValueError(f"config item spec {kwargs!r} has no name")
+            name = kwargs.pop("name")
+            if name in self._actions or name in new_actions:
+                raise ValueError(
+                    f"Config item with name '{name}' already exists"
+                )
+            if isinstance(kwargs.get("type"), str):
+                if kwargs["type"] not in type_names:
+                    raise ValueError(
+                        f"unknown type '{kwargs['type']}' for config item "
+                        f"'{name}'"
+                    )
+                kwargs["type"] = type_names[kwargs["type"]]
+            new_actions[name] = self._create_action(name, kwargs)
+
+        for name in new_actions:
+            self._action_indexes[name] = len(self._action_indexes)
+        self._actions.update(new_actions)
+        self._plan = None
+        return list(new_actions.values())
+
+    def _create_action(self, name, kwargs):
+        if "default" not in kwargs and self._global_default is not NOT_GIVEN:
+            kwargs["default"] = self._global_default
+        return Action.create(name=name, **kwargs)
+
     def add_source(self, source, *args, **kwargs):
         """
         Add a new config source to the :class:`ConfigParser`.
@@ -1781,80 +2811,739 @@ class ConfigParser:
 
         * ``dict``: for getting config values from Python dictionaries.
 
+        * ``directory``: for getting config values from a directory containing
+          a file for each config item.
+
         See :ref:`Sources` for more information about the built-in sources and
         creating your own sources.
 
         Return the created config source object.
         """
         source_obj = Source.create(
-            source, self._actions.copy(), *args, **kwargs,
+            source, self._get_actions_view(), *args, **kwargs,
         )
         self._sources.append(source_obj)
-        return source
+        self._plan = None
+        return source_obj
+
+    def _get_actions_view(self):
+        # Sources only see the config items that were added before them. The
+        # same view is shared by all of the sources added between calls to
+        # add_config().
+        view = self._actions_view
+        if view is None or len(view) != len(self._actions):
+            view = _ActionsView(
+                self._actions, self._action_indexes, len(self._actions)
+            )
+            self._actions_view = view
+        return view
 
-    def _accumulate_mentions(self, namespace, mentions):
-        # Sort the values according to the priorities of the sources,
-        # lowest priority first. When accumulating, sources should give the
-        # so-far-accumulated value less priority than a new value.
-        #
-        # sorted() is guaranteed to use a stable sort so the order in which
-        # values are given for any particular source is preserved.
-        mentions = sorted(mentions, key=operator.attrgetter("priority"))
+    def compile(self):
+        """
+        Compile the config items and sources added to the
+        :class:`ConfigParser` into a plan for running the parse.
+
+        The plan contains everything about the parse that doesn't depend on
+        the values found in the sources (e.g. default values, required config
+        items and the config items that each source should ignore), so that
+        repeated calls to :meth:`parse_config` only need to do the work that
+        does depend on those values.
+
+        Calling this method is optional: :meth:`parse_config` and
+        :meth:`partially_parse_config` compile the plan themselves if there
+        isn't an up to date one. The plan is discarded whenever
+        :meth:`add_config` or :meth:`add_source` is called. Changes made to
+        :class:`Action` objects after the plan has been compiled are not seen
+        by the plan.
+        """
+        self._plan = self._make_plan(self._incremental)
+        return self._plan
+
+    def _make_plan(self, incremental):
+        return _ParsePlan(
+            self._actions.values(),
+            self._sources,
+            incremental=incremental,
+            strict=self._strict,
+            lazy_types=self._lazy_types,
+            namespace_slots=self._namespace_slots,
+        )
+
+    def _get_plan(self):
+        if self._plan is None:
+            return self.compile()
+        return self._plan
+
+    @staticmethod
+    def _accumulate_mentions(namespace, mention_lists, plan):
+        mentions = ConfigParser._merge_mentions(mention_lists)
+        if plan.last_mention_wins_dests:
+            mentions = ConfigParser._last_mentions_for_dests(
+                mentions, plan.last_mention_wins_dests
+            )
+        accumulators = plan.accumulators
         for mention in mentions:
-            mention.action.accumulate_mention(namespace, mention)
+            accumulate = accumulators.get(id(mention.action))
+            if accumulate is None:
+                accumulate = mention.action.accumulate_mention
+            accumulate(namespace, mention)
 
-    def _parse_config(self, check_required):
-        ns = Namespace()
-        self._collect_defaults(ns)
-        mentions = self._collect_mentions()
-        self._accumulate_mentions(ns, mentions)
+    @staticmethod
+    def _last_mentions_for_dests(mentions, dests):
+        # Return the given mentions (which must be in priority order) with
+        # every mention of a config item with a dest in dests removed except
+        # the last (highest priority) mention for each dest.
+        kept = []
+        last_mentions = {}
+        for mention in mentions:
+            dest = mention.action.dest
+            if dest in dests:
+                last_mentions[dest] = mention
+            else:
+                kept.append(mention)
+        kept.extend(last_mentions.values())
+        return kept
+
+    @staticmethod
+    def _merge_mentions(mention_lists):
+        # Return an iterable of the mentions in the given lists (one list per
+        # source) sorted by priority, lowest priority first. When
+        # accumulating, sources should give the so-far-accumulated value less
+        # priority than a new value.
+        #
+        # Mentions with the same priority are kept in the order of the lists
+        # and in their order within each list, just like a stable sort of
+        # all of the mentions would. Sources usually give all of their
+        # mentions the same priority, so it's normally only the lists that
+        # need sorting rather than all of the mentions.
+        get_priority = operator.attrgetter("priority")
+        runs = []
+        all_uniform = True
+        for mentions in mention_lists:
+            if not mentions:
+                continue
+            priorities = set(map(get_priority, mentions))
+            if len(priorities) == 1:
+                runs.append((priorities.pop(), mentions))
+            else:
+                all_uniform = False
+                runs.append((None, sorted(mentions, key=get_priority)))
+        if all_uniform:
+            runs.sort(key=operator.itemgetter(0))
+            return itertools.chain.from_iterable(m for p, m in runs)
+        return heapq.merge(*(m for p, m in runs), key=get_priority)
+
+    def _parse_config(self, check_required, executor=None, frozen=False):
+        plan = self._get_plan()
+        cache_key = None
+        if self._cache_path is not None:
+            cache_key = self._cache_key(plan, check_required)
+        if cache_key is None:
+            return self._parse_with_plan(
+                plan, check_required, executor, frozen
+            )
+        values = _read_cache_file(self._cache_path, cache_key)
+        if values is not None:
+            if frozen:
+                return _frozen_namespace_from_dict(values)
+            return _make_namespace(plan.namespace_class, values)
+        # Cache the values before they are frozen, so that the cached values
+        # are the same for frozen and unfrozen parses.
+        ns = self._parse_with_plan(plan, check_required, executor, False)
+        values = _namespace_values(ns)
+        _write_cache_file(self._cache_path, cache_key, values)
+        if frozen:
+            return plan.freeze(values)
+        return ns
+
+    def _cache_key(self, plan, check_required):
+        # Return a key for the persistent cache of parse results, or None if
+        # the results can't be cached.
+        if self._lazy_types:
+            # Caching would convert every value when it's parsed, so errors
+            # from type functions wouldn't be deferred until access.
+            return None
+        source_fingerprints = []
+        for source, allowed in plan.sources:
+            fingerprint = source.persistent_fingerprint()
+            if fingerprint is None:
+                return None
+            source_fingerprints.append(
+                (
+                    _stable_repr(type(source)),
+                    source.priority,
+                    repr(fingerprint),
+                )
+            )
+        actions = [
+            (_stable_repr(type(action)), _stable_repr(vars(action)))
+            for action in self._actions.values()
+        ]
+        key = repr(
+            (
+                __version__,
+                actions,
+                source_fingerprints,
+                self._strict,
+                check_required,
+            )
+        )
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _parse_with_plan(plan, check_required, executor, frozen):
+        to_read = ConfigParser._sources_to_read(plan)
+        mention_lists = ConfigParser._read_sources(
+            [plan.sources[index] for index, fingerprint in to_read], executor
+        )
+        return ConfigParser._finish_parse(
+            plan, to_read, mention_lists, check_required, frozen
+        )
+
+    async def _parse_config_async(self, check_required, executor, frozen):
+        plan = self._get_plan()
+        to_read = self._sources_to_read(plan)
+        mention_lists = await self._read_sources_async(
+            [plan.sources[index] for index, fingerprint in to_read], executor
+        )
+        return self._finish_parse(
+            plan, to_read, mention_lists, check_required, frozen
+        )
+
+    @staticmethod
+    def _sources_to_read(plan):
+        # Return (index, fingerprint) pairs for the sources in the plan that
+        # need to be read for this parse.
+        if not plan.incremental:
+            return [(index, None) for index in range(len(plan.sources))]
+        to_read = []
+        for index, (source, allowed) in enumerate(plan.sources):
+            fingerprint = source.fingerprint()
+            cached = plan.mention_cache[index]
+            if (
+                cached is None
+                or fingerprint is None
+                or cached[0] != fingerprint
+            ):
+                to_read.append((index, fingerprint))
+        return to_read
+
+    @staticmethod
+    def _finish_parse(plan, read, mention_lists, check_required, frozen):
+        if plan.incremental:
+            ns = ConfigParser._parse_incrementally(
+                plan, read, mention_lists, frozen
+            )
+        else:
+            ns = Namespace()
+            ConfigParser._collect_defaults(ns, plan)
+            ConfigParser._accumulate_mentions(ns, mention_lists, plan)
         if check_required:
-            self._check_required_configs(ns)
-        self._process_missing(ns)
+            ConfigParser._check_required_configs(ns, plan)
+        ConfigParser._process_missing(ns, plan)
+        if frozen:
+            return plan.freeze(vars(ns))
+        if plan.namespace_class is not Namespace:
+            ns = _make_namespace(plan.namespace_class, vars(ns))
         return ns
 
-    def _collect_mentions(self):
-        return [
-            mention
-            for source in self._sources
-            for mention in source.parse_config()
-            if not self._ignore_config_for_source(mention.action, source)
+    @staticmethod
+    def _parse_incrementally(plan, read, mention_lists, frozen):
+        # Recalculate only the config items mentioned (or previously
+        # mentioned) by the sources that have been re-read. The accumulated
+        # values are kept in the plan so they are thrown away with it if
+        # config items or sources are added.
+        #
+        # The new mention cache and values are only stored in the plan once
+        # the values have been recalculated successfully, so that a parse
+        # that raises an error (e.g. for an invalid choice) doesn't leave
+        # mentions in the cache that the values don't reflect.
+        mention_cache, changed_dests = ConfigParser._update_mention_cache(
+            plan, read, mention_lists
+        )
+        if plan.values is None:
+            values = ConfigParser._accumulate_cached_mentions(
+                plan, mention_cache
+            )
+        elif changed_dests:
+            values = plan.values.copy()
+            for dest in changed_dests:
+                values.pop(dest, None)
+            changed = ConfigParser._accumulate_cached_mentions(
+                plan, mention_cache, changed_dests
+            )
+            values.update(changed)
+        else:
+            values = plan.values
+        plan.mention_cache = mention_cache
+        plan.values = values
+        if frozen:
+            # Frozen values are shared between results, so the same objects
+            # are kept to let plan.freeze() reuse their frozen versions.
+            return _namespace_from_dict(values)
+        # The values are kept for the next parse, so give the caller copies
+        # of the containers that it can modify.
+        return _namespace_from_dict(
+            {dest: _copy_containers(value) for dest, value in values.items()}
+        )
+
+    @staticmethod
+    def _accumulate_cached_mentions(plan, mention_cache, dests=None):
+        ns = Namespace()
+        ConfigParser._collect_defaults(ns, plan, dests)
+        mention_lists = [
+            source_mentions
+            if dests is None
+            else [m for m in source_mentions if m.action.dest in dests]
+            for fingerprint, source_mentions, summary in mention_cache
         ]
+        ConfigParser._accumulate_mentions(ns, mention_lists, plan)
+        return vars(ns)
 
-    def _collect_defaults(self, ns):
-        for action in self._actions.values():
-            if action.default is NOT_GIVEN or action.default is SUPPRESS:
-                continue
-            setattr(ns, action.dest, action.default)
+    @staticmethod
+    def _update_mention_cache(plan, read, mention_lists):
+        # Return a copy of the plan's mention cache updated with the mentions
+        # found in the sources that have been re-read, and the set of dests
+        # of config items whose mentions in those sources have changed since
+        # the last time they were read.
+        #
+        # The entries are (fingerprint, mentions, summary) tuples. The
+        # summary of the mentions is made when they are stored rather than
+        # when they are compared because mentions may share lists with the
+        # source (e.g. a DictSource's values), which can be changed in place.
+        mention_cache = list(plan.mention_cache)
+        changed_dests = set()
+        for (index, fingerprint), mentions in zip(read, mention_lists):
+            cached = mention_cache[index]
+            new = _mentions_by_dest(mentions)
+            if cached is None:
+                changed_dests.update(new)
+            else:
+                old = cached[2]
+                changed_dests.update(
+                    dest
+                    for dest in old.keys() | new.keys()
+                    if old.get(dest) != new.get(dest)
+                )
+            mention_cache[index] = (fingerprint, mentions, new)
+        return mention_cache, changed_dests
+
+    @staticmethod
+    def _read_sources(sources, executor):
+        # Return a list containing the list of mentions found by each of the
+        # given (source, allowed actions) pairs, in the same order as the
+        # sources. If an executor is given, the sources are read concurrently.
+        if executor is None or len(sources) < 2:
+            return [
+                ConfigParser._source_mentions(source, allowed)
+                for source, allowed in sources
+            ]
+        futures = [
+            executor.submit(ConfigParser._source_mentions, source, allowed)
+            for source, allowed in sources
+        ]
+        return [future.result() for future in futures]
+
+    @staticmethod
+    async def _read_sources_async(sources, executor):
+        # Like _read_sources() but await AsyncSources concurrently and run
+        # other sources using the event loop's executor.
+        loop = asyncio.get_event_loop()
+        awaitables = []
+        for source, allowed in sources:
+            if isinstance(source, AsyncSource):
+                awaitables.append(
+                    ConfigParser._async_source_mentions(source, allowed)
+                )
+            else:
+                awaitables.append(
+                    loop.run_in_executor(
+                        executor,
+                        ConfigParser._source_mentions,
+                        source,
+                        allowed,
+                    )
+                )
+        return await asyncio.gather(*awaitables)
+
+    @staticmethod
+    async def _async_source_mentions(source, allowed):
+        mentions = await source.parse_config()
+        return ConfigParser._filter_mentions(mentions, allowed)
 
-    def partially_parse_config(self):
+    @staticmethod
+    def _source_mentions(source, allowed):
+        if isinstance(source, AsyncSource):
+            mentions = _run_coroutine(source.parse_config())
+        else:
+            mentions = source.parse_config()
+        return ConfigParser._filter_mentions(mentions, allowed)
+
+    @staticmethod
+    def _filter_mentions(mentions, allowed):
+        if allowed is None:
+            return mentions
+        return [m for m in mentions if id(m.action) in allowed]
+
+    @staticmethod
+    def _collect_defaults(ns, plan, dests=None):
+        for dest, default in plan.defaults:
+            if dests is not None and dest not in dests:
+                continue
+            # Accumulating actions (e.g. append) modify the value they find in
+            # the namespace, so give them a copy of the default rather than
+            # the default itself.
+            if isinstance(default, list):
+                default = list(default)
+            setattr(ns, dest, default)
+
+    def partially_parse_config(self, executor=None, frozen=False):
         """
         Parse the config sources, but don't raise a RequiredConfigNotFoundError
         exception if a required config is not found in any config source.
 
+        The ``executor`` and ``frozen`` arguments are the same as for
+        :meth:`parse_config`.
+
         Returns: a Namespace object containing the parsed
         values.
         """
-        return self._parse_config(check_required=False)
+        return self._parse_config(
+            check_required=False, executor=executor, frozen=frozen
+        )
 
-    def parse_config(self):
+    def parse_config(self, executor=None, frozen=False):
         """
         Parse the config sources.
 
+        If an ``executor`` (a :class:`concurrent.futures.Executor`, e.g. a
+        :class:`concurrent.futures.ThreadPoolExecutor`) is given, the sources'
+        :meth:`Source.parse_config` methods are run concurrently using the
+        executor. This is useful when reading sources is slow, e.g. when
+        config files are on network file systems. The config values are
+        combined in the same way whether or not an executor is used.
+
+        If ``frozen`` is :data:`True`, the result is a :class:`FrozenNamespace`
+        rather than a :class:`Namespace`.
+
+        Returns: a :class:`Namespace` object containing the parsed values.
+        """
+        return self._parse_config(
+            check_required=True, executor=executor, frozen=frozen
+        )
+
+    async def partially_parse_config_async(self, executor=None, frozen=False):
+        """
+        A coroutine version of :meth:`partially_parse_config`. See
+        :meth:`parse_config_async`.
+        """
+        return await self._parse_config_async(
+            check_required=False, executor=executor, frozen=frozen
+        )
+
+    async def parse_config_async(self, executor=None, frozen=False):
+        """
+        A coroutine version of :meth:`parse_config` for use with
+        :mod:`asyncio`.
+
+        The :meth:`AsyncSource.parse_config` coroutines of :class:`AsyncSource`
+        sources are awaited concurrently. Other sources are read concurrently
+        using the event loop's :meth:`~asyncio.loop.run_in_executor` method
+        with the given ``executor`` (or the event loop's default executor if
+        ``executor`` is :data:`None`) so that they don't block the event
+        loop.
+
         Returns: a :class:`Namespace` object containing the parsed values.
         """
-        return self._parse_config(check_required=True)
+        return await self._parse_config_async(
+            check_required=True, executor=executor, frozen=frozen
+        )
+
+    def parse_many(
+        self,
+        source_lists,
+        executor=None,
+        chunksize=1,
+        check_required=True,
+        frozen=False,
+    ):
+        """
+        Parse many independent sets of config sources against the config items
+        of the :class:`ConfigParser`.
+
+        Each item of ``source_lists`` is a list of source specifications. A
+        source specification is either a :class:`Source` object or a
+        :class:`dict` with a ``source`` key (with the same meaning as the
+        ``source`` argument of :meth:`add_source`) and other keys for the
+        other arguments of :meth:`add_source`. E.g.
+
+        .. code-block:: python
+
+            for values in parser.parse_many(
+                [{"source": "dict", "values_dict": d}] for d in tenant_dicts
+            ):
+                ...
+
+        The sources added to the :class:`ConfigParser` with
+        :meth:`add_source` are not used. The parts of the parse that only
+        depend on the config items are worked out once and shared by the
+        parses of all of the source lists.
+
+        The arguments are:
+
+        * ``source_lists``: an iterable of lists of source specifications.
+
+        * ``executor`` (optional): a :class:`concurrent.futures.Executor` used
+          to parse the source lists concurrently. A
+          :class:`concurrent.futures.ProcessPoolExecutor` can be used to spread
+          the parses across processes, as long as the config items and the
+          source specifications can be pickled.
+
+        * ``chunksize`` (optional): the number of source lists sent to each
+          process at a time when ``executor`` is a
+          :class:`concurrent.futures.ProcessPoolExecutor`. Larger values reduce
+          the overhead of sending work to the processes.
 
-    def _process_missing(self, ns):
-        for action in self._actions.values():
-            if not hasattr(ns, action.dest) and action.default is not SUPPRESS:
-                setattr(ns, action.dest, None)
+        * ``check_required`` (optional): if :data:`False`, don't raise a
+          :class:`RequiredConfigNotFoundError` when a required config item
+          isn't found, like :meth:`partially_parse_config`. The default is
+          :data:`True`.
+
+        * ``frozen`` (optional): the same as for :meth:`parse_config`.
+
+        Returns: an iterator over :class:`Namespace` objects containing the
+        parsed values for each source list, in the same order as
+        ``source_lists``.
+        """
+        parser = _SourceListParser(
+            self._get_actions_view(),
+            strict=self._strict,
+            lazy_types=self._lazy_types,
+            namespace_slots=self._namespace_slots,
+            check_required=check_required,
+            frozen=frozen,
+        )
+        if executor is None:
+            return map(parser, source_lists)
+        return executor.map(parser, source_lists, chunksize=chunksize)
+
+    def watch(
+        self,
+        callback=None,
+        interval=1.0,
+        debounce=0.1,
+        error_callback=None,
+        frozen=True,
+        backend="auto",
+    ):
+        """
+        Parse the config and start a background thread that parses it again
+        whenever the sources change.
+
+        The arguments are:
+
+        * ``callback`` (optional): a function that is called with the new
+          :class:`Namespace` (from the background thread) whenever the
+          parsed config values change. Exceptions raised by ``callback`` are
+          passed to ``error_callback``, or printed if there isn't one, and
+          don't stop the watcher. Callbacks registered with
+          :meth:`subscribe` are also called when the values of the config
+          items they subscribe to change.
+
+        * ``interval`` (optional): the number of seconds between checks for
+          changes to the sources. The default is ``1.0``.
+
+        * ``debounce`` (optional): the number of seconds that the sources must
+          stay unchanged after a change is found before the config is parsed
+          again, so that a series of changes (e.g. to several files) only
+          causes one parse. The default is ``0.1``.
+
+        * ``error_callback`` (optional): a function that is called with the
+          exception (from the background thread) if parsing the config
+          fails. The previous config values are kept when this happens. If
+          ``error_callback`` isn't given, the exception is printed with
+          :func:`sys.excepthook` instead.
+
+        * ``frozen`` (optional): if :data:`True`, the parsed config values are
+          :class:`FrozenNamespace` objects, which can be shared between threads
+          safely. The default is :data:`True`.
+
+        * ``backend`` (optional): how the background thread waits between
+          checks for changes. The values that ``backend`` can take are:
+
+          * ``"poll"``: check for changes every ``interval`` seconds.
+
+          * ``"inotify"``: use Linux's inotify API to wait for changes to the
+            paths returned by the sources' :meth:`Source.watched_paths`
+            methods and their parent directories, so that paths that are
+            deleted and created again are watched again. The sources are
+            still checked every ``interval`` seconds if any of them can't be
+            watched. :class:`OSError` is raised if
+            inotify isn't available.
+
+          * ``"auto"``: use ``"inotify"`` if it is available and ``"poll"``
+            otherwise. This is the default.
+
+        Changes to sources are found using :meth:`Source.fingerprint`, so only
+        the sources that have changed are read again. Sources whose
+        :meth:`Source.fingerprint` method returns :data:`None` are read at
+        every check, but ``callback`` is still only called if the config
+        values change.
+
+        The config is parsed once before this method returns, and exceptions
+        from that parse are raised by this method. Config items and sources
+        added to the :class:`ConfigParser` after this method is called are
+        not seen by the watcher.
+
+        Returns: a :class:`ConfigWatcher` object.
+        """
+        return ConfigWatcher(
+            self,
+            self._make_plan(incremental=True),
+            callback=callback,
+            interval=interval,
+            debounce=debounce,
+            error_callback=error_callback,
+            frozen=frozen,
+            backend=backend,
+        )
+
+    @staticmethod
+    def diff(old, new):
+        """
+        Compare the config values in two :class:`Namespace` objects.
+
+        ``old`` may be :data:`None`, in which case every config value in
+        ``new`` is treated as changed. Values of config items that are missing
+        from one of the :class:`Namespace` objects (because their ``default``
+        is :const:`SUPPRESS`) are given as :const:`NOT_GIVEN`.
+
+        Returns: a :class:`dict` with an item for each ``dest`` whose value
+        has changed, with ``dest`` as the key and an ``(old_value,
+        new_value)`` :class:`tuple` as the value.
+        """
+        old_values = {} if old is None else _namespace_values(old)
+        new_values = _namespace_values(new)
+        changes = {}
+        for dest, new_value in new_values.items():
+            old_value = old_values.get(dest, NOT_GIVEN)
+            if old_value is new_value:
+                continue
+            if (
+                old_value.__class__ is not new_value.__class__
+                or old_value != new_value
+            ):
+                changes[dest] = (old_value, new_value)
+        for dest, old_value in old_values.items():
+            if dest not in new_values:
+                changes[dest] = (old_value, NOT_GIVEN)
+        return changes
+
+    def subscribe(self, names, callback):
+        """
+        Register a function to be called when the values of some config items
+        change.
+
+        ``names`` is the name of a config item or an iterable of names of
+        config items. When :meth:`notify_subscribers` finds that the values of
+        any of the config items have changed, ``callback`` is called once
+        with a :class:`dict` like the one returned by :meth:`diff`, but
+        containing only the changes to the subscribed config items.
+
+        :class:`ConfigWatcher` objects created by :meth:`watch` call
+        :meth:`notify_subscribers` whenever the config values change.
+
+        Returns: an object that can be passed to :meth:`unsubscribe`.
+        """
+        if isinstance(names, str):
+            names = [names]
+        dests = []
+        for name in names:
+            if name not in self._actions:
+                raise ValueError(f"unknown config item '{name}'")
+            dests.append(self._actions[name].dest)
+        subscription = _Subscription(callback, frozenset(dests))
+        for dest in subscription.dests:
+            # Replace the tuples rather than modifying them so that
+            # notify_subscribers() can run concurrently in a watcher thread.
+            self._subscriptions[dest] = self._subscriptions.get(
+                dest, ()
+            ) + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """
+        Stop calling a function registered with :meth:`subscribe`.
+        ``subscription`` is the object returned by :meth:`subscribe`.
+        """
+        for dest in subscription.dests:
+            remaining = tuple(
+                s
+                for s in self._subscriptions.get(dest, ())
+                if s is not subscription
+            )
+            if remaining:
+                self._subscriptions[dest] = remaining
+            else:
+                self._subscriptions.pop(dest, None)
+
+    def notify_subscribers(self, old, new, error_callback=None):
+        """
+        Call the functions registered with :meth:`subscribe` for the config
+        items whose values differ between the :class:`Namespace` objects
+        ``old`` and ``new``.
 
-    def _check_required_configs(self, namespace):
-        for action in self._actions.values():
-            if action.required and not hasattr(namespace, action.dest):
+        Only the subscriptions for the changed config items are looked at, so
+        the cost doesn't depend on the total number of subscriptions.
+
+        Every subscribed function is called even if some of them raise
+        exceptions. The arguments are:
+
+        * ``old``: the :class:`Namespace` with the previous config values, or
+          :data:`None`.
+
+        * ``new``: the :class:`Namespace` with the new config values.
+
+        * ``error_callback`` (optional): a function that is called with each
+          exception raised by a subscribed function. If ``error_callback`` is
+          not given, the first exception is raised once all the subscribed
+          functions have been called.
+
+        Returns: the changes, as returned by :meth:`diff`.
+        """
+        changes = self.diff(old, new)
+        self._call_subscribers(changes, error_callback)
+        return changes
+
+    def _call_subscribers(self, changes, error_callback):
+        notified = {}
+        for dest in changes:
+            for subscription in self._subscriptions.get(dest, ()):
+                notified.setdefault(subscription, []).append(dest)
+        first_error = None
+        for subscription, dests in notified.items():
+            try:
+                subscription.callback({dest: changes[dest] for dest in dests})
+            except Exception as e:
+                if error_callback is not None:
+                    error_callback(e)
+                elif first_error is None:
+                    first_error = e
+        if first_error is not None:
+            raise first_error
+
+    @staticmethod
+    def _process_missing(ns, plan):
+        for dest in plan.missing:
+            if not hasattr(ns, dest):
+                setattr(ns, dest, None)
+
+    @staticmethod
+    def _check_required_configs(namespace, plan):
+        for dest, name in plan.required:
+            if not hasattr(namespace, dest):
                 raise RequiredConfigNotFoundError(
-                    f"Did not find value for config item '{action.name}'"
+                    f"Did not find value for config item '{name}'"
                 )
 
     @staticmethod
@@ -1872,11 +3561,615 @@ class ConfigParser:
         return False
 
 
+class ConfigWatcher:
+    """
+    Watches the sources of a :class:`ConfigParser` for changes. Create
+    :class:`ConfigWatcher` objects with :meth:`ConfigParser.watch`.
+
+    The latest config values are available from the :attr:`latest` attribute
+    at any time, without locking. Stop the background thread with
+    :meth:`stop`, or by using the :class:`ConfigWatcher` as a context manager:
+
+    .. code-block:: python
+
+        with parser.watch(callback=on_config_change) as watcher:
+            while True:
+                handle_request(watcher.latest)
+    """
+
+    def __init__(
+        self,
+        parser,
+        plan,
+        callback,
+        interval,
+        debounce,
+        error_callback,
+        frozen,
+        backend,
+    ):
+        if backend not in ("auto", "inotify", "poll"):
+            raise ValueError(f"unknown watch backend '{backend}'")
+        self._parser = parser
+        self._plan = plan
+        self._callback = callback
+        self._interval = interval
+        self._debounce = debounce
+        self._error_callback = error_callback
+        self._frozen = frozen
+        self._stop_event = threading.Event()
+        self._notifier = None
+        self._notifier_timeout = interval
+        try:
+            if backend != "poll":
+                self._start_notifier(required=backend == "inotify")
+            self._fingerprints = self._get_fingerprints()
+            latest = self._parse()
+        except BaseException:
+            # The thread that would close the notifier won't be started.
+            if self._notifier is not None:
+                self._notifier.close()
+            raise
+
+        self.latest = latest
+        """
+        The :class:`Namespace` from the most recent successful parse.
+        """
+
+        self._thread = threading.Thread(
+            target=self._run, name="multiconfparse-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the background thread and wait for it to finish.
+        """
+        self._stop_event.set()
+        if self._notifier is not None:
+            self._notifier.wake()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _start_notifier(self, required):
+        paths = []
+        self._all_sources_watchable = True
+        for source, allowed in self._plan.sources:
+            source_paths = source.watched_paths()
+            if source_paths is None:
+                self._all_sources_watchable = False
+            else:
+                paths.extend(source_paths)
+        try:
+            self._notifier = _InotifyNotifier()
+        except OSError:
+            if required:
+                raise
+            return
+        all_watched = True
+        for path in paths:
+            if not self._notifier.add_watch(path):
+                all_watched = False
+        self._set_notifier_timeout(all_watched)
+
+    def _set_notifier_timeout(self, all_watched):
+        # Only rely on notifications if every source's paths are watched.
+        # Otherwise, fall back to checking every interval.
+        if all_watched and self._all_sources_watchable:
+            self._notifier_timeout = None
+        else:
+            self._notifier_timeout = self._interval
+
+    def _run(self):
+        try:
+            while self._wait():
+                self._check()
+        finally:
+            if self._notifier is not None:
+                self._notifier.close()
+
+    def _wait(self):
+        # Wait until the sources might have changed. Return False if the
+        # watcher has been stopped.
+        if self._notifier is None:
+            return not self._stop_event.wait(self._interval)
+        self._notifier.wait(self._notifier_timeout)
+        # Watched directories may have been replaced, which removes their
+        # watches. Changes made before the watches are added again are found
+        # by the check that follows.
+        self._set_notifier_timeout(self._notifier.rewatch())
+        return not self._stop_event.is_set()
+
+    def _check(self):
+        fingerprints = self._get_fingerprints()
+        if fingerprints == self._fingerprints and None not in fingerprints:
+            return
+        fingerprints = self._wait_for_changes_to_settle(fingerprints)
+        if fingerprints is None:
+            return
+        self._fingerprints = fingerprints
+        self._reload()
+
+    def _wait_for_changes_to_settle(self, fingerprints):
+        # Return the fingerprints once they've stopped changing, or None if
+        # the watcher is stopped while waiting.
+        while self._debounce > 0:
+            if self._stop_event.wait(self._debounce):
+                return None
+            new_fingerprints = self._get_fingerprints()
+            if new_fingerprints == fingerprints:
+                break
+            fingerprints = new_fingerprints
+        return fingerprints
+
+    def _reload(self):
+        try:
+            ns = self._parse()
+        except Exception as e:
+            self._report_error(e)
+            return
+        # Use diff() rather than == so that changes of type (e.g. from 1 to
+        # True) are noticed.
+        changes = ConfigParser.diff(self.latest, ns)
+        if not changes:
+            return
+        self.latest = ns
+        if self._callback is not None:
+            try:
+                self._callback(ns)
+            except Exception as e:
+                self._report_error(e)
+        self._parser._call_subscribers(changes, self._report_error)
+
+    def _report_error(self, e):
+        # Report an exception without letting it stop the background thread.
+        # Exceptions that can't be passed to error_callback are printed like
+        # uncaught exceptions.
+        if self._error_callback is not None:
+            try:
+                self._error_callback(e)
+                return
+            except Exception as callback_error:
+                e = callback_error
+        sys.excepthook(type(e), e, e.__traceback__)
+
+    def _parse(self):
+        return ConfigParser._parse_with_plan(
+            self._plan, check_required=True, executor=None, frozen=self._frozen
+        )
+
+    def _get_fingerprints(self):
+        return [source.fingerprint() for source, allowed in self._plan.sources]
+
+
+class _Subscription:
+    # A callback registered with ConfigParser.subscribe().
+
+    __slots__ = ("callback", "dests")
+
+    def __init__(self, callback, dests):
+        self.callback = callback
+        self.dests = dests
+
+
+class _InotifyNotifier:
+    # Waits for changes to files and directories using Linux's inotify API,
+    # called through ctypes. A pipe is used to wake the waiting thread when
+    # the watcher is stopped.
+
+    _IN_NONBLOCK = 0o4000
+    _IN_CLOEXEC = 0o2000000
+    _WATCH_MASK = (
+        0x00000002  # IN_MODIFY
+        | 0x00000004  # IN_ATTRIB
+        | 0x00000008  # IN_CLOSE_WRITE
+        | 0x00000040  # IN_MOVED_FROM
+        | 0x00000080  # IN_MOVED_TO
+        | 0x00000100  # IN_CREATE
+        | 0x00000200  # IN_DELETE
+        | 0x00000400  # IN_DELETE_SELF
+        | 0x00000800  # IN_MOVE_SELF
+    )
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(None, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self._libc = libc
+        self._fd = libc.inotify_init1(self._IN_NONBLOCK | self._IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._wake_r, self._wake_w = os.pipe()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._paths = []
+
+    def add_watch(self, path):
+        # Watch for changes to path. Return whether it could be watched.
+        path = os.fspath(path)
+        self._paths.append(path)
+        return self._watch(path)
+
+    def rewatch(self):
+        # Add the watches for the paths again. Watches are removed when the
+        # watched directories are deleted or replaced, and a directory may
+        # have been created where there wasn't one. Return whether all the
+        # paths are watched.
+        return all([self._watch(path) for path in self._paths])
+
+    def _watch(self, path):
+        # Watch the parent directory of path, so that path being created,
+        # deleted or replaced by renaming something over it is noticed, and
+        # path itself if it's a directory, so that changes to its contents are
+        # noticed.
+        watched = self._add(os.path.dirname(os.path.abspath(path)))
+        if os.path.isdir(path):
+            watched = self._add(path) and watched
+        return watched
+
+    def _add(self, path):
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(path), self._WATCH_MASK
+        )
+        return wd >= 0
+
+    def wait(self, timeout):
+        # Wait for an event or a call to wake(), then discard the events.
+        ready, _, _ = select.select([self._fd, self._wake_r], [], [], timeout)
+        if self._fd in ready:
+            self._drain(self._fd)
+
+    def wake(self):
+        with self._lock:
+            if not self._closed:
+                os.write(self._wake_w, b"x")
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            for fd in (self._fd, self._wake_r, self._wake_w):
+                os.close(fd)
+
+    @staticmethod
+    def _drain(fd):
+        try:
+            while os.read(fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+
+
+class _ParsePlan:
+    # The parts of a parse that depend only on a ConfigParser's config items
+    # and sources, worked out once so they can be reused by every parse. See
+    # ConfigParser.compile().
+
+    def __init__(
+        self,
+        actions,
+        sources,
+        incremental=False,
+        strict=True,
+        lazy_types=False,
+        namespace_slots=False,
+    ):
+        actions = list(actions)
+        self.defaults = [
+            (action.dest, action.default)
+            for action in actions
+            if action.default is not NOT_GIVEN
+            and action.default is not SUPPRESS
+        ]
+        self.required = [
+            (action.dest, action.name) for action in actions if action.required
+        ]
+        self.missing = [
+            action.dest for action in actions if action.default is not SUPPRESS
+        ]
+        self.accumulators = {
+            id(action): action._compile_accumulator() for action in actions
+        }
+        self.last_mention_wins_dests = set()
+        if not strict:
+            self.last_mention_wins_dests = self._last_mention_wins_dests(
+                actions
+            )
+        if namespace_slots:
+            self.namespace_class = _make_slots_namespace_class(
+                (action.dest for action in actions), lazy=lazy_types
+            )
+        elif lazy_types:
+            self.namespace_class = _LazyNamespace
+        else:
+            self.namespace_class = Namespace
+        if lazy_types:
+            for action in actions:
+                if action.nargs == 0:
+                    continue
+                if action.dest in self.last_mention_wins_dests:
+                    accumulate = action._compile_lazy_accumulator()
+                    self.accumulators[id(action)] = accumulate
+        self._actions = actions
+        self.incremental = incremental
+        self._allowed_by_source_class = {}
+        self.sources = [
+            (source, self.allowed_actions(source)) for source in sources
+        ]
+
+        # State kept between parses by ConfigParsers in incremental mode: the
+        # fingerprint and mentions found for each source the last time it was
+        # read, and the config values accumulated from those mentions.
+        self.mention_cache = [None] * len(self.sources)
+        self.values = None
+
+        # The (value, frozen value) pairs from the last call to freeze().
+        self.frozen_values = {}
+
+    def with_sources(self, sources):
+        # Return a plan for parsing the given sources that shares the parts of
+        # this plan that only depend on config items.
+        plan = copy.copy(self)
+        plan.incremental = False
+        plan.sources = [
+            (source, self.allowed_actions(source)) for source in sources
+        ]
+        plan.mention_cache = [None] * len(plan.sources)
+        plan.values = None
+        plan.frozen_values = {}
+        return plan
+
+    def freeze(self, values):
+        # Return a FrozenNamespace for the given values, reusing the frozen
+        # values from the previous call for values that are the same objects
+        # as last time (i.e. values of config items that weren't recalculated
+        # in incremental mode).
+        frozen_values = {}
+        for dest, value in values.items():
+            if isinstance(value, _LazyValue):
+                value = value.get()
+            previous = self.frozen_values.get(dest)
+            if previous is not None and previous[0] is value:
+                frozen_values[dest] = previous
+            else:
+                frozen_values[dest] = (value, _freeze(value))
+        self.frozen_values = frozen_values
+        return FrozenNamespace(
+            {dest: frozen for dest, (value, frozen) in frozen_values.items()}
+        )
+
+    @staticmethod
+    def _last_mention_wins_dests(actions):
+        # A dest's value only depends on its last mention if that's true of
+        # every config item that uses the dest.
+        dests = set()
+        other_dests = set()
+        for action in actions:
+            if action._last_mention_wins():
+                dests.add(action.dest)
+            else:
+                other_dests.add(action.dest)
+        return dests - other_dests
+
+    def allowed_actions(self, source):
+        # Return the set of IDs of the actions whose mentions should be kept
+        # for the given source, or None if no mentions should be dropped.
+        #
+        # Whether a source ignores a config item only depends on the source's
+        # class, so the sets are shared between sources of the same class.
+        cls = type(source)
+        if cls not in self._allowed_by_source_class:
+            allowed = [
+                action
+                for action in self._actions
+                if not ConfigParser._ignore_config_for_source(action, source)
+            ]
+            if len(allowed) == len(self._actions):
+                allowed_ids = None
+            else:
+                allowed_ids = frozenset(id(action) for action in allowed)
+            self._allowed_by_source_class[cls] = allowed_ids
+        return self._allowed_by_source_class[cls]
+
+
+class _ActionsView(collections.abc.Mapping):
+    # A read-only view of the first count config items added to a
+    # ConfigParser. Config items are never removed from a ConfigParser, so
+    # the view doesn't change when more config items are added.
+
+    def __init__(self, actions, indexes, count):
+        self._actions = actions
+        self._indexes = indexes
+        self._count = count
+        self._values = None
+        self._items = None
+
+    def __getitem__(self, name):
+        if not self._indexes.get(name, self._count) < self._count:
+            raise KeyError(name)
+        return self._actions[name]
+
+    def __contains__(self, name):
+        return self._indexes.get(name, self._count) < self._count
+
+    def __iter__(self):
+        return itertools.islice(self._actions, self._count)
+
+    def __len__(self):
+        return self._count
+
+    def get(self, name, default=None):
+        if not self._indexes.get(name, self._count) < self._count:
+            return default
+        return self._actions[name]
+
+    def values(self):
+        if self._values is None:
+            self._values = tuple(
+                itertools.islice(self._actions.values(), self._count)
+            )
+        return self._values
+
+    def items(self):
+        if self._items is None:
+            self._items = tuple(
+                itertools.islice(self._actions.items(), self._count)
+            )
+        return self._items
+
+
+class _SourceListParser:
+    # Parses a list of source specifications for ConfigParser.parse_many().
+    # Objects of this class are picklable (as long as the actions are) so
+    # they can be used with a ProcessPoolExecutor; the plan is rebuilt after
+    # unpickling rather than pickled.
+
+    def __init__(self, actions, check_required, frozen, **plan_options):
+        self._actions = actions
+        self._check_required = check_required
+        self._frozen = frozen
+        self._plan_options = plan_options
+        self._plan = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_plan"] = None
+        return state
+
+    def __call__(self, source_specs):
+        if self._plan is None:
+            self._plan = _ParsePlan(
+                self._actions.values(), [], **self._plan_options
+            )
+        sources = [self._create_source(spec) for spec in source_specs]
+        return ConfigParser._parse_with_plan(
+            self._plan.with_sources(sources),
+            self._check_required,
+            None,
+            self._frozen,
+        )
+
+    def _create_source(self, spec):
+        if isinstance(spec, Source):
+            return spec
+        kwargs = dict(spec)
+        return Source.create(kwargs.pop("source"), self._actions, **kwargs)
+
+
+class _DecodedFileCache:
+    # A thread safe LRU cache of decoded files, limited by the total
+    # (estimated) size of the cached data. See JsonSource._load_path().
+
+    def __init__(self, max_bytes):
+        self._max_bytes = max_bytes
+        self._entries = collections.OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, nbytes):
+        with self._lock:
+            old_entry = self._entries.pop(key, None)
+            if old_entry is not None:
+                self._total_bytes -= old_entry[1]
+            if nbytes > self._max_bytes:
+                return
+            self._entries[key] = (value, nbytes)
+            self._total_bytes += nbytes
+            self._evict()
+
+    def set_max_bytes(self, max_bytes):
+        with self._lock:
+            self._max_bytes = max_bytes
+            self._evict()
+
+    def _evict(self):
+        while self._total_bytes > self._max_bytes:
+            key, (value, nbytes) = self._entries.popitem(last=False)
+            self._total_bytes -= nbytes
+
+
+_json_file_cache = _DecodedFileCache(32 * 1024 * 1024)
+
+
 # ------------------------------------------------------------------------------
 # Free functions
 # ------------------------------------------------------------------------------
 
 
+@contextlib.contextmanager
+def mapped_file(path):
+    """
+    A context manager for reading a file through a read-only memory map.
+
+    The value of the ``with`` statement is a read-only :class:`memoryview` of
+    the contents of the file at ``path``. For example:
+
+    .. code-block:: python
+
+        with multiconfparse.mapped_file(path) as view:
+            text = str(view, "utf-8")
+
+    Reading a file this way avoids copying its contents into a read buffer,
+    and the pages of the file are shared with other processes that map the
+    same file. Empty files and files that aren't regular files (which can't
+    be memory mapped) are read normally instead.
+
+    The :class:`memoryview` must not be used after the ``with`` statement, and
+    no other :class:`memoryview` objects derived from it may still exist at
+    the end of the ``with`` statement.
+    """
+    with open(path, mode="rb") as f:
+        st = os.fstat(f.fileno())
+        if not stat.S_ISREG(st.st_mode) or st.st_size == 0:
+            yield memoryview(f.read())
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                yield view
+
+
+def set_json_decoder(decoder):
+    """
+    Set the default decoder for ``json`` sources created after this call.
+
+    ``decoder`` is a callable with the same semantics as :func:`json.loads`,
+    or :data:`None` to restore the default of :func:`json.loads`.
+    """
+    global _default_json_decoder
+    if decoder is None:
+        decoder = json.loads
+    _default_json_decoder = decoder
+
+
+def set_json_cache_size(max_bytes):
+    """
+    Set the size of the cache of decoded JSON files shared by all ``json``
+    sources in the process.
+
+    ``max_bytes`` is the maximum total size of the files whose decoded data
+    is kept in the cache. Files that haven't been used recently are removed
+    from the cache to keep it within this size. Set ``max_bytes`` to ``0`` to
+    disable the cache. The default size is 32 MiB.
+    """
+    _json_file_cache.set_max_bytes(max_bytes)
+
+
 def _getattr_or_none(obj, attr):
     if hasattr(obj, attr):
         return getattr(obj, attr)
@@ -1887,6 +4180,238 @@ def _has_nonnone_attr(obj, attr):
     return _getattr_or_none(obj, attr) is not NOT_GIVEN
 
 
+def _mentions_by_dest(mentions):
+    # Return a dict with a comparable summary of the given mentions for each
+    # dest. The types of the arguments are included so that e.g. a change
+    # from 1 to True is noticed.
+    by_dest = {}
+    for mention in mentions:
+        by_dest.setdefault(mention.action.dest, []).append(
+            (
+                id(mention.action),
+                [(type(arg), arg) for arg in mention.args],
+                mention.priority,
+            )
+        )
+    return by_dest
+
+
+def _copy_containers(value):
+    # Copy lists, sets and dicts (and the lists, sets and dicts inside them)
+    # so that changes to the copy don't affect the original.
+    if isinstance(value, list):
+        return [_copy_containers(v) for v in value]
+    if isinstance(value, set):
+        return set(value)
+    if isinstance(value, dict):
+        return {k: _copy_containers(v) for k, v in value.items()}
+    return value
+
+
+def _freeze(value):
+    # Tuples (including subclasses like namedtuples) and frozensets are left
+    # as they are, so that their types are kept.
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, set):
+        return frozenset(value)
+    if isinstance(value, dict):
+        return types.MappingProxyType(
+            {k: _freeze(v) for k, v in value.items()}
+        )
+    return value
+
+
+def _run_coroutine(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def _stable_repr(value, seen=frozenset()):
+    # Return a repr of value that doesn't include the addresses of functions
+    # and classes, so that it can be compared between processes. Functions
+    # are identified by their code, defaults and closure as well as their
+    # names, since e.g. all lambdas have the same name. seen holds the ids of
+    # the functions being rendered, to stop recursive closures.
+    if isinstance(value, types.FunctionType):
+        name = f"{value.__module__}.{value.__qualname__}"
+        if id(value) in seen:
+            return name
+        seen = seen | {id(value)}
+        closure = []
+        for cell in value.__closure__ or ():
+            try:
+                closure.append(cell.cell_contents)
+            except ValueError:
+                # An empty cell.
+                closure.append(NOT_GIVEN)
+        details = _stable_repr(
+            [value.__defaults__, value.__kwdefaults__, closure], seen
+        )
+        return f"{name}({_code_digest(value.__code__)}, {details})"
+    if isinstance(value, (types.BuiltinFunctionType, type)):
+        return f"{value.__module__}.{value.__qualname__}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(_stable_repr(v, seen) for v in value) + "]"
+    if isinstance(value, (set, frozenset)):
+        return (
+            "{"
+            + ", ".join(sorted(_stable_repr(v, seen) for v in value))
+            + "}"
+        )
+    if isinstance(value, dict):
+        return (
+            "{"
+            + ", ".join(
+                f"{_stable_repr(k, seen)}: {_stable_repr(v, seen)}"
+                for k, v in value.items()
+            )
+            + "}"
+        )
+    return repr(value)
+
+
+def _code_digest(code):
+    # Return a digest of a code object's bytecode, constants (including
+    # nested code objects) and the names that it uses.
+    def code_key(code):
+        return (
+            code.co_code,
+            code.co_names,
+            [
+                code_key(c) if isinstance(c, types.CodeType) else repr(c)
+                for c in code.co_consts
+            ],
+        )
+
+    return hashlib.sha256(repr(code_key(code)).encode("utf-8")).hexdigest()
+
+
+def _read_cache_file(path, key):
+    # Return the cached config values for key from the cache file at path, or
+    # None if there aren't any.
+    try:
+        with open(path, mode="rb") as f:
+            cached_key, values = pickle.load(f)
+    except Exception:
+        # A missing, unreadable or corrupt cache is just a cache miss.
+        return None
+    if cached_key != key:
+        return None
+    return values
+
+
+def _write_cache_file(path, key, values):
+    # Write the config values for key to the cache file at path atomically,
+    # so that other processes never see a partly written file.
+    try:
+        data = pickle.dumps((key, values))
+    except Exception:
+        # The values can't be pickled, so they can't be cached.
+        return
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def _thaw(value):
+    # Undo the parts of _freeze() that stop values from being pickled.
+    if type(value) is tuple:
+        return [_thaw(v) for v in value]
+    if isinstance(value, (dict, types.MappingProxyType)):
+        return {k: _thaw(v) for k, v in value.items()}
+    return value
+
+
+def _frozen_namespace_from_dict(d):
+    return FrozenNamespace({k: _freeze(v) for k, v in d.items()})
+
+
+def _decode_json_fields(s, names, decode):
+    # Decode the JSON object in s, but only keep the values of the fields in
+    # names. The top-level fields are found with the json module's C scanner,
+    # which decodes each value; the values of other fields are dropped
+    # straight away. decode is a function like json.loads() that is used to
+    # decode the wanted values, if it isn't json.loads() itself.
+    idx = _JSON_WHITESPACE_RE.match(s).end()
+    if s[idx:idx + 1] != "{":
+        # Not an object, so there's nothing to skip.
+        return decode(s)
+    values = {}
+    idx = _JSON_WHITESPACE_RE.match(s, idx + 1).end()
+    if s[idx:idx + 1] == "}":
+        idx += 1
+    else:
+        while True:
+            if s[idx:idx + 1] != '"':
+                raise json.JSONDecodeError(
+                    "Expecting property name enclosed in double quotes",
+                    s,
+                    idx,
+                )
+            name, idx = json.decoder.scanstring(s, idx + 1)
+            idx = _JSON_WHITESPACE_RE.match(s, idx).end()
+            if s[idx:idx + 1] != ":":
+                raise json.JSONDecodeError("Expecting ':' delimiter", s, idx)
+            idx = _JSON_WHITESPACE_RE.match(s, idx + 1).end()
+            value, end = _scan_json_value(s, idx)
+            if name in names:
+                # Values decoded by the scanner are what json.loads() would
+                # return, so they only need decoding again for other decoders.
+                values[name] = (
+                    value if decode is json.loads else decode(s[idx:end])
+                )
+            idx = end
+            idx = _JSON_WHITESPACE_RE.match(s, idx).end()
+            delimiter = s[idx:idx + 1]
+            idx = _JSON_WHITESPACE_RE.match(s, idx + 1).end()
+            if delimiter == "}":
+                break
+            if delimiter != ",":
+                raise json.JSONDecodeError(
+                    "Expecting ',' delimiter", s, idx - 1
+                )
+    idx = _JSON_WHITESPACE_RE.match(s, idx).end()
+    if idx != len(s):
+        raise json.JSONDecodeError("Extra data", s, idx)
+    return values
+
+
+def _scan_json_value(s, idx):
+    # Return the decoded JSON value that starts at idx and the index of its
+    # end.
+    try:
+        return _scan_json(s, idx)
+    except StopIteration as e:
+        raise json.JSONDecodeError("Expecting value", s, e.value) from None
+
+
+def _args_from_string(action, value, none_values):
+    # Return the arguments for a mention of a config item given as a single
+    # string, e.g. in an environment variable.
+    if value in none_values and action.nargs in (0, "?", "*"):
+        return []
+    if action.nargs == 0:
+        raise InvalidValueForNargs0Error(value, none_values)
+    if action.nargs is None or action.nargs in (1, "?"):
+        return [value]
+    return shlex.split(value)
+
+
 def _namespace_from_dict(d, actions=None):
     ns = Namespace()
     if actions is not None:
@@ -4,15 +4,22 @@
 # SPDX-License-Identifier: MIT
 
 import argparse
+import asyncio
+import collections
+import concurrent.futures
 import io
 import itertools
 import json
 import os
 import pathlib
+import pickle
 import pytest
+import queue
 import shlex
+import shutil
 import sys
 import tempfile
+import threading
 import unittest.mock as utm
 
 sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
@@ -187,6 +194,21 @@ class JsonEncoderWithPath(json.JSONEncoder):
         return super().default(o)
 
 
+class EventAsyncSource(mcp.AsyncSource):
+    # Waits for wait_event to be set after setting set_event, so a pair of
+    # these sources can only be read if they are awaited concurrently.
+    def __init__(self, actions, values, set_event, wait_event, priority=0):
+        super().__init__(actions, priority=priority)
+        self._dict_source = mcp.DictSource(actions, values, priority=priority)
+        self._set_event = set_event
+        self._wait_event = wait_event
+
+    async def parse_config(self):
+        self._set_event.set()
+        await asyncio.wait_for(self._wait_event.wait(), timeout=10)
+        return self._dict_source.parse_config()
+
+
 class _OmitTestForSource:
     def __str__(self):
         return "OMIT_TEST_FOR_SOURCE"
@@ -581,6 +603,1050 @@ def test_suppress_help(capfd):
         assert "--config-item3" in out
 
 
+def test_compile():
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c1", type=int, choices=[1, 2])
+    mcp_parser.add_config("c2", default="v2")
+    mcp_parser.add_source("dict", {"c1": "1"})
+    mcp_parser.compile()
+    values = mcp_parser.parse_config()
+    assert values == mcp._namespace_from_dict({"c1": 1, "c2": "v2"})
+
+    # Adding config items and sources discards the compiled plan
+    mcp_parser.add_config("c3", required=True)
+    with pytest.raises(mcp.RequiredConfigNotFoundError):
+        mcp_parser.parse_config()
+    mcp_parser.add_source("dict", {"c3": "v3"})
+    values = mcp_parser.parse_config()
+    expected_values = mcp._namespace_from_dict(
+        {"c1": 1, "c2": "v2", "c3": "v3"}
+    )
+    assert values == expected_values
+
+
+def test_repeated_parse():
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c1", action="append", default=["d"])
+    mcp_parser.add_config("c2", action="count", default=1)
+    mcp_parser.add_source("dict", {"c1": "v1", "c2": None})
+    expected_values = mcp._namespace_from_dict({"c1": ["d", "v1"], "c2": 2})
+    assert mcp_parser.parse_config() == expected_values
+    assert mcp_parser.parse_config() == expected_values
+
+
+def test_custom_accumulate_mention():
+    class ReverseArgsAction(mcp.Action):
+        def accumulate_mention(self, namespace, mention):
+            mention.args = list(reversed(mention.args))
+            super().accumulate_mention(namespace, mention)
+
+        def __call__(self, namespace, args):
+            setattr(namespace, self.dest, args)
+
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c1", action=ReverseArgsAction, nargs=2)
+    mcp_parser.add_source("dict", {"c1": ["v1", "v2"]})
+    values = mcp_parser.parse_config()
+    assert values == mcp._namespace_from_dict({"c1": ["v2", "v1"]})
+
+
+def test_incremental():
+    class CountingSource(mcp.Source):
+        def __init__(self, actions, values, priority=0):
+            super().__init__(actions, priority=priority)
+            self.values = values
+            self.parse_count = 0
+
+        def parse_config(self):
+            self.parse_count += 1
+            return [
+                mcp.ConfigMention(self.actions[k], [v], self.priority)
+                for k, v in self.values.items()
+            ]
+
+        def fingerprint(self):
+            return tuple(self.values.items())
+
+    mcp_parser = mcp.ConfigParser(incremental=True)
+    mcp_parser.add_config("c1", action="append", default=["d"])
+    mcp_parser.add_config("c2", type=int)
+    mcp_parser.add_config("c3", default="v3")
+    d = {"c1": "v1_dict"}
+    mcp_parser.add_source("dict", d)
+    counting_source = mcp_parser.add_source(
+        CountingSource, {"c1": "v1_counting", "c2": "1"}, priority=1
+    )
+    expected_values = mcp._namespace_from_dict(
+        {"c1": ["d", "v1_dict", "v1_counting"], "c2": 1, "c3": "v3"}
+    )
+    assert mcp_parser.parse_config() == expected_values
+    assert mcp_parser.parse_config() == expected_values
+    assert counting_source.parse_count == 1
+
+    d["c1"] = "v1_dict_changed"
+    d["c3"] = "v3_dict"
+    expected_values = mcp._namespace_from_dict(
+        {
+            "c1": ["d", "v1_dict_changed", "v1_counting"],
+            "c2": 1,
+            "c3": "v3_dict",
+        }
+    )
+    assert mcp_parser.parse_config() == expected_values
+    assert counting_source.parse_count == 1
+
+    counting_source.values = {"c2": "2"}
+    del d["c3"]
+    expected_values = mcp._namespace_from_dict(
+        {"c1": ["d", "v1_dict_changed"], "c2": 2, "c3": "v3"}
+    )
+    assert mcp_parser.parse_config() == expected_values
+    assert counting_source.parse_count == 2
+
+
+def test_incremental_error_not_cached():
+    mcp_parser = mcp.ConfigParser(incremental=True)
+    mcp_parser.add_config("c1", type=int, choices=[1, 2])
+    mcp_parser.add_config("c2")
+    d1 = {"c1": "1"}
+    d2 = {"c2": "v2"}
+    mcp_parser.add_source("dict", d1)
+    mcp_parser.add_source("dict", d2)
+    assert mcp_parser.parse_config() == mcp._namespace_from_dict(
+        {"c1": 1, "c2": "v2"}
+    )
+    d1["c1"] = "5"
+    with pytest.raises(mcp.InvalidChoiceError):
+        mcp_parser.parse_config()
+    # The error is raised again even if only another source has changed.
+    d2["c2"] = "v2a"
+    with pytest.raises(mcp.InvalidChoiceError):
+        mcp_parser.parse_config()
+    d1["c1"] = "2"
+    assert mcp_parser.parse_config() == mcp._namespace_from_dict(
+        {"c1": 2, "c2": "v2a"}
+    )
+
+
+def test_incremental_results_are_independent():
+    mcp_parser = mcp.ConfigParser(incremental=True)
+    mcp_parser.add_config("c1", action="append", nargs=2)
+    mcp_parser.add_config("c2", type=json.loads)
+    mcp_parser.add_config("c3")
+    d = {"c1": ["x", "y"], "c2": '{"k": [1]}', "c3": "v3"}
+    mcp_parser.add_source("dict", d)
+    values = mcp_parser.parse_config()
+    values.c1.append("MUT")
+    values.c1[0].append("MUT")
+    values.c2["k"].append("MUT")
+    d["c3"] = "v3a"
+    assert mcp_parser.parse_config() == mcp._namespace_from_dict(
+        {"c1": [["x", "y"]], "c2": {"k": [1]}, "c3": "v3a"}
+    )
+
+
+def test_incremental_list_changed_in_place():
+    mcp_parser = mcp.ConfigParser(incremental=True)
+    mcp_parser.add_config("c1", action="extend", nargs="+")
+    d = {"c1": ["1", "2"]}
+    mcp_parser.add_source("dict", d)
+    assert mcp_parser.parse_config().c1 == ["1", "2"]
+    d["c1"].append("3")
+    assert mcp_parser.parse_config().c1 == ["1", "2", "3"]
+
+
+def test_incremental_with_env():
+    mcp_parser = mcp.ConfigParser(incremental=True)
+    mcp_parser.add_config("c1", type=int)
+    mcp_parser.add_config("c2", action=UcStoreAction)
+    mcp_parser.add_source("environment", env_var_prefix="TEST_")
+    env = {"TEST_C1": "1", "TEST_C2": "v2"}
+    with utm.patch.object(os, "environ", env):
+        values = mcp_parser.parse_config()
+        assert values == mcp._namespace_from_dict({"c1": 1, "c2": "V2"})
+        env["TEST_C1"] = "2"
+        values = mcp_parser.parse_config()
+        assert values == mcp._namespace_from_dict({"c1": 2, "c2": "V2"})
+        del env["TEST_C2"]
+        values = mcp_parser.parse_config()
+        assert values == mcp._namespace_from_dict({"c1": 2, "c2": None})
+
+
+def test_env_snapshot():
+    mcp_parser = mcp.ConfigParser(incremental=True)
+    mcp_parser.add_config("c1", type=int)
+    env = {"TEST_C1": "1"}
+    snapshot = mcp.EnvironmentSnapshot(env)
+    source = mcp_parser.add_source(
+        "environment", env_var_prefix="TEST_", environ=snapshot
+    )
+    env["TEST_C1"] = "2"
+    assert mcp_parser.parse_config() == mcp._namespace_from_dict({"c1": 1})
+    with utm.patch.object(
+        source, "parse_config", side_effect=AssertionError
+    ):
+        source.set_environ(mcp.EnvironmentSnapshot({"TEST_C1": "1"}))
+        assert mcp_parser.parse_config() == mcp._namespace_from_dict(
+            {"c1": 1}
+        )
+    source.set_environ(mcp.EnvironmentSnapshot(env))
+    assert mcp_parser.parse_config() == mcp._namespace_from_dict({"c1": 2})
+    source.set_environ({"TEST_C1": "3"})
+    assert mcp_parser.parse_config() == mcp._namespace_from_dict({"c1": 3})
+
+    assert snapshot == {"TEST_C1": "1"}
+    assert snapshot != mcp.EnvironmentSnapshot(env)
+    assert len(mcp.EnvironmentSnapshot()) == len(os.environ)
+
+
+def test_parse_with_executor():
+    # Each source waits for the other to start reading, so the parse only
+    # succeeds if the sources are read concurrently.
+    barrier = threading.Barrier(2, timeout=10)
+
+    class WaitingSource(mcp.Source):
+        def __init__(self, actions, values_dict, priority=0):
+            super().__init__(actions, priority=priority)
+            self._dict_source = mcp.DictSource(
+                actions, values_dict, priority=priority
+            )
+
+        def parse_config(self):
+            barrier.wait()
+            return self._dict_source.parse_config()
+
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c1", action="append")
+    mcp_parser.add_source(WaitingSource, {"c1": "v1"}, priority=2)
+    mcp_parser.add_source(WaitingSource, {"c1": "v2"}, priority=1)
+    mcp_parser.add_source("dict", {"c1": "v3"}, priority=1)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+        values = mcp_parser.parse_config(executor=executor)
+    assert values == mcp._namespace_from_dict({"c1": ["v2", "v3", "v1"]})
+
+
+def test_parse_config_async():
+    async def parse():
+        event1 = asyncio.Event()
+        event2 = asyncio.Event()
+        mcp_parser = mcp.ConfigParser()
+        mcp_parser.add_config("c1", action="append")
+        mcp_parser.add_config("c2", required=True)
+        mcp_parser.add_source(
+            EventAsyncSource, {"c1": "v1"}, event1, event2, priority=2
+        )
+        mcp_parser.add_source(
+            EventAsyncSource, {"c1": "v2"}, event2, event1, priority=1
+        )
+        mcp_parser.add_source("dict", {"c1": "v3"}, priority=3)
+        values = await mcp_parser.partially_parse_config_async()
+        assert values == mcp._namespace_from_dict(
+            {"c1": ["v2", "v1", "v3"], "c2": None}
+        )
+        with pytest.raises(mcp.RequiredConfigNotFoundError):
+            await mcp_parser.parse_config_async()
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(parse())
+    finally:
+        loop.close()
+
+
+def test_parse_config_with_async_source():
+    class AsyncDictSource(mcp.AsyncSource):
+        def __init__(self, actions, values, priority=0):
+            super().__init__(actions, priority=priority)
+            self._dict_source = mcp.DictSource(actions, values)
+
+        async def parse_config(self):
+            await asyncio.sleep(0)
+            return self._dict_source.parse_config()
+
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c1")
+    mcp_parser.add_source(AsyncDictSource, {"c1": "v1"})
+    values = mcp_parser.parse_config()
+    assert values == mcp._namespace_from_dict({"c1": "v1"})
+
+
+def test_merge_mentions():
+    action = mcp.Action.create(name="c")
+    mention_lists = [
+        [mcp.ConfigMention(action, [f"a{i}"], 2) for i in range(100)],
+        [mcp.ConfigMention(action, [f"b{i}"], i % 3) for i in range(100)],
+        [],
+        [mcp.ConfigMention(action, [f"c{i}"], 1) for i in range(100)],
+        [mcp.ConfigMention(action, [f"d{i}"], 2) for i in range(100)],
+    ]
+    expected = sorted(
+        itertools.chain.from_iterable(mention_lists),
+        key=lambda m: m.priority,
+    )
+    merged = mcp.ConfigParser._merge_mentions(mention_lists)
+    assert list(merged) == expected
+
+    del mention_lists[1]
+    expected = [m for m in expected if not m.args[0].startswith("b")]
+    merged = mcp.ConfigParser._merge_mentions(mention_lists)
+    assert list(merged) == expected
+
+
+def test_priorities_with_large_extend():
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c", action="extend", type=int)
+    mcp_parser.add_source("dict", {"c": list(range(0, 10000))}, priority=2)
+    mcp_parser.add_source(
+        "json",
+        fileobj=io.StringIO(json.dumps({"c": list(range(10000, 20000))})),
+        priority=1,
+    )
+    mcp_parser.add_source("dict", {"c": list(range(20000, 30000))}, priority=2)
+    values = mcp_parser.parse_config()
+    expected = list(range(10000, 20000)) + list(range(0, 10000))
+    expected += list(range(20000, 30000))
+    assert values.c == expected
+
+
+def test_non_strict():
+    converted = []
+
+    def convert(value):
+        converted.append(value)
+        return int(value)
+
+    def make_parser(strict):
+        mcp_parser = mcp.ConfigParser(strict=strict)
+        mcp_parser.add_config("c1", type=convert, choices=[1, 2])
+        mcp_parser.add_config("c2", action="store_true")
+        mcp_parser.add_config("c3", action="append", type=convert)
+        mcp_parser.add_config("c4", action="store_const", const="v4", dest="d")
+        mcp_parser.add_config("c5", dest="d")
+        mcp_parser.add_source("dict", {"c1": "2", "c3": "3"}, priority=1)
+        mcp_parser.add_source("dict", {"c1": "x", "c2": None}, priority=2)
+        mcp_parser.add_source("dict", {"c1": "1", "c3": "4"}, priority=3)
+        mcp_parser.add_source("dict", {"c5": "v5", "c4": None}, priority=3)
+        return mcp_parser
+
+    with pytest.raises(ValueError):
+        make_parser(strict=True).parse_config()
+
+    converted.clear()
+    values = make_parser(strict=False).parse_config()
+    expected_values = mcp._namespace_from_dict(
+        {"c1": 1, "c2": True, "c3": [3, 4], "d": "v4"}
+    )
+    assert values == expected_values
+    assert sorted(converted) == ["1", "3", "4"]
+
+
+def test_lazy_types():
+    converted = []
+
+    def convert(value):
+        converted.append(value)
+        return int(value)
+
+    with pytest.raises(ValueError):
+        mcp.ConfigParser(lazy_types=True)
+
+    mcp_parser = mcp.ConfigParser(strict=False, lazy_types=True)
+    mcp_parser.add_config("c1", type=convert)
+    mcp_parser.add_config("c2", type=convert, nargs=2)
+    mcp_parser.add_config("c3", type=convert, choices=[1, 2])
+    mcp_parser.add_config("c4", action="append", type=convert)
+    mcp_parser.add_config("c5", type=convert, default=5)
+    mcp_parser.add_source(
+        "dict", {"c1": "x", "c2": ["2", "3"], "c3": "3", "c4": "4"},
+    )
+    mcp_parser.add_source("dict", {"c1": "1"}, priority=1)
+    values = mcp_parser.parse_config()
+    assert converted == ["4"]
+    assert values.c1 == 1
+    assert values.c1 == 1
+    assert converted == ["4", "1"]
+    assert values.c5 == 5
+    with pytest.raises(mcp.InvalidChoiceError):
+        values.c3
+    with pytest.raises(AttributeError):
+        values.c6
+
+    values = mcp_parser.partially_parse_config()
+    values.c3 = 3
+    expected_values = mcp._namespace_from_dict(
+        {"c1": 1, "c2": [2, 3], "c3": 3, "c4": [4], "c5": 5}
+    )
+    assert values == expected_values
+
+
+@pytest.mark.parametrize(
+    "kwargs", ({}, {"strict": False, "lazy_types": True})
+)
+def test_namespace_with_internal_looking_dests(kwargs):
+    mcp_parser = mcp.ConfigParser(**kwargs)
+    mcp_parser.add_config("_values", type=int)
+    mcp_parser.add_config("_set_values")
+    mcp_parser.add_source("dict", {"_values": "1", "_set_values": "v"})
+    values = mcp_parser.parse_config()
+    assert values._values == 1
+    assert str(values) == str({"_values": 1, "_set_values": "v"})
+    assert values == mcp._namespace_from_dict(
+        {"_values": 1, "_set_values": "v"}
+    )
+
+
+def test_lazy_types_nargs_error():
+    mcp_parser = mcp.ConfigParser(strict=False, lazy_types=True)
+    mcp_parser.add_config("c1", type=int, nargs=2)
+    mcp_parser.add_source("dict", {"c1": ["1"]})
+    with pytest.raises(mcp.InvalidNumberOfValuesError):
+        mcp_parser.parse_config()
+
+
+def test_namespace_slots():
+    mcp_parser = mcp.ConfigParser(namespace_slots=True)
+    mcp_parser.add_config("c1")
+    mcp_parser.add_config("c2", action="append", dest="d")
+    mcp_parser.add_config("c3", action="append", dest="d")
+    mcp_parser.add_config("c4", default=mcp.SUPPRESS)
+    mcp_parser.add_source("dict", {"c1": "v1", "c2": "v2", "c3": "v3"})
+    values = mcp_parser.parse_config()
+    assert isinstance(values, mcp.Namespace)
+    assert not hasattr(values, "__dict__")
+    assert values.c1 == "v1"
+    assert values.d == ["v2", "v3"]
+    assert not hasattr(values, "c4")
+    assert values == mcp._namespace_from_dict({"c1": "v1", "d": ["v2", "v3"]})
+    assert str(values) == str({"c1": "v1", "d": ["v2", "v3"]})
+    values.c1 = "v1a"
+    assert values.c1 == "v1a"
+    with pytest.raises(AttributeError):
+        values.c5 = "v5"
+    assert mcp_parser.parse_config().__class__ is values.__class__
+    unpickled = pickle.loads(pickle.dumps(values))
+    assert unpickled == values
+
+
+@pytest.mark.parametrize("lazy_types", (False, True))
+def test_namespace_slots_with_internal_looking_dests(lazy_types):
+    mcp_parser = mcp.ConfigParser(
+        strict=not lazy_types, lazy_types=lazy_types, namespace_slots=True
+    )
+    dests = ("_dests", "_values", "_pending_lazy_values")
+    for dest in dests:
+        mcp_parser.add_config(dest)
+    mcp_parser.add_source("dict", {dest: dest for dest in dests})
+    values = mcp_parser.parse_config()
+    expected = {dest: dest for dest in dests}
+    assert values._dests == "_dests"
+    assert str(values) == str(expected)
+    assert values == mcp._namespace_from_dict(expected)
+
+    mcp_parser.add_config("__eq__")
+    with pytest.raises(ValueError, match="__eq__"):
+        mcp_parser.parse_config()
+
+
+def test_namespace_slots_with_lazy_types():
+    mcp_parser = mcp.ConfigParser(
+        strict=False, lazy_types=True, namespace_slots=True
+    )
+    mcp_parser.add_config("c1", type=int)
+    mcp_parser.add_config("c2", type=int, choices=[1])
+    mcp_parser.add_source("dict", {"c1": "1", "c2": "2"})
+    values = mcp_parser.parse_config()
+    assert not hasattr(values, "__dict__")
+    assert values.c1 == 1
+    with pytest.raises(mcp.InvalidChoiceError):
+        values.c2
+
+
+def test_frozen():
+    mcp_parser = mcp.ConfigParser(incremental=True)
+    mcp_parser.add_config("c1", action="append", nargs=2)
+    mcp_parser.add_config("c2", type=json.loads)
+    mcp_parser.add_config("c3")
+    d = {"c1": ["v1a", "v1b"], "c2": '{"k": [1, 2]}', "c3": "v3"}
+    mcp_parser.add_source("dict", d)
+    values = mcp_parser.parse_config(frozen=True)
+    assert isinstance(values, mcp.FrozenNamespace)
+    assert values.c1 == (("v1a", "v1b"),)
+    assert values.c2 == {"k": (1, 2)}
+    with pytest.raises(TypeError):
+        values.c2["k"] = 1
+    with pytest.raises(AttributeError):
+        values.c3 = "v3a"
+    with pytest.raises(AttributeError):
+        del values.c3
+    assert values == mcp._namespace_from_dict(
+        {"c1": (("v1a", "v1b"),), "c2": {"k": (1, 2)}, "c3": "v3"}
+    )
+
+    d["c3"] = "v3a"
+    new_values = mcp_parser.parse_config(frozen=True)
+    assert new_values.c3 == "v3a"
+    assert new_values.c1 is values.c1
+    assert new_values.c2 is values.c2
+
+
+def test_frozen_pickle():
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c1", type=json.loads)
+    mcp_parser.add_source("dict", {"c1": '{"k": [1, {"k2": 2}]}'})
+    values = mcp_parser.parse_config(frozen=True)
+    unpickled = pickle.loads(pickle.dumps(values))
+    assert isinstance(unpickled, mcp.FrozenNamespace)
+    assert unpickled == values
+    with pytest.raises(TypeError):
+        unpickled.c1["k"][1]["k2"] = 3
+
+
+FrozenPoint = collections.namedtuple("FrozenPoint", ["x", "y"])
+
+
+def test_frozen_keeps_tuple_types():
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config(
+        "c1", type=lambda s: FrozenPoint(*s.split(",")), action="append"
+    )
+    mcp_parser.add_source("dict", {"c1": "1,2"})
+    assert mcp_parser.parse_config().c1[0].__class__ is FrozenPoint
+    values = mcp_parser.parse_config(frozen=True)
+    assert values.c1 == (FrozenPoint("1", "2"),)
+    assert values.c1[0].__class__ is FrozenPoint
+    unpickled = pickle.loads(pickle.dumps(values))
+    assert unpickled.c1[0].__class__ is FrozenPoint
+
+
+def test_choices_collections():
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c1", action="extend", type=int, choices=range(100))
+    mcp_parser.add_config("c2", action="extend", choices=[["a"], "b", "c"])
+    mcp_parser.add_config("c3", choices="abc")
+    mcp_parser.add_config("c4", type=json.loads, choices=({"k": 1}, 1))
+    mcp_parser.add_config("c5", type=json.loads, action="extend", choices=[1])
+    d = {"c1": ["1", "99"], "c2": ["b"], "c3": "bc", "c4": '{"k": 1}'}
+    mcp_parser.add_source("dict", d)
+    values = mcp_parser.parse_config()
+    assert values == mcp._namespace_from_dict(
+        {"c1": [1, 99], "c2": ["b"], "c3": "bc", "c4": {"k": 1}, "c5": None}
+    )
+
+    d["c1"] = ["1", "100"]
+    with pytest.raises(mcp.InvalidChoiceError, match="'100'"):
+        mcp_parser.parse_config()
+    d["c1"] = ["1"]
+    d["c5"] = ["1", "[1]", "2"]
+    with pytest.raises(mcp.InvalidChoiceError, match=r"'\[1\]'"):
+        mcp_parser.parse_config()
+
+
+def test_add_configs():
+    mcp_parser = mcp.ConfigParser(config_default="d")
+    actions = mcp_parser.add_configs(
+        {"c1": {"type": "int"}, "c2": {"action": "append", "default": ["d2"]}}
+    )
+    assert [action.name for action in actions] == ["c1", "c2"]
+    mcp_parser.add_configs(
+        [{"name": "c3", "type": "path"}, {"name": "c4"}],
+        type_names={"path": pathlib.Path},
+    )
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = pathlib.Path(tmpdir) / "schema.json"
+        path.write_text(json.dumps([{"name": "c5", "nargs": "+"}]))
+        mcp_parser.add_configs(path)
+
+    mcp_parser.add_source(
+        "dict", {"c1": "1", "c2": "v2", "c3": "v3", "c5": ["v5", "v5a"]}
+    )
+    assert mcp_parser.parse_config() == mcp._namespace_from_dict(
+        {
+            "c1": 1,
+            "c2": ["d2", "v2"],
+            "c3": pathlib.Path("v3"),
+            "c4": "d",
+            "c5": ["v5", "v5a"],
+        }
+    )
+
+    with pytest.raises(ValueError):
+        mcp_parser.add_configs({"c6": {}, "c1": {}})
+    with pytest.raises(ValueError):
+        mcp_parser.add_configs({"c6": {}, "c7": {"type": "unknown"}})
+    with pytest.raises(ValueError):
+        mcp_parser.add_configs([{"name": "c6"}, {"name": "c6"}])
+    with pytest.raises(ValueError, match="no name"):
+        mcp_parser.add_configs([{"name": "c6"}, {"type": "int"}])
+    assert "c6" not in mcp_parser._actions
+
+
+def test_sources_share_actions():
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c1")
+    source1 = mcp_parser.add_source("dict", {"c1": "v1", "c2": "v2"})
+    source2 = mcp_parser.add_source("dict", {"c1": "v1a"}, priority=1)
+    mcp_parser.add_configs({"c2": {}, "c3": {}})
+    source3 = mcp_parser.add_source("dict", {"c3": "v3"})
+    assert source1.actions is source2.actions
+    assert list(source1.actions) == ["c1"]
+    assert "c2" not in source1.actions
+    assert source1.actions.get("c2") is None
+    with pytest.raises(KeyError):
+        source1.actions["c2"]
+    with pytest.raises(TypeError):
+        source1.actions["c2"] = mcp_parser._actions["c2"]
+    assert list(source3.actions) == ["c1", "c2", "c3"]
+    assert [a.name for a in source3.actions.values()] == ["c1", "c2", "c3"]
+    assert mcp_parser.parse_config() == mcp._namespace_from_dict(
+        {"c1": "v1a", "c2": None, "c3": "v3"}
+    )
+
+
+def test_watch():
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c1")
+    mcp_parser.add_config("c2", default="d2")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = pathlib.Path(tmpdir) / "config.json"
+        path.write_text('{"c1": "v1"}')
+        mcp_parser.add_source("json", path=path)
+        mcp_parser.add_source("dict", {"c2": "v2"}, priority=1)
+        changes = []
+        errors = []
+        changed = threading.Event()
+        failed = threading.Event()
+
+        def callback(values):
+            changes.append(values)
+            changed.set()
+
+        def error_callback(e):
+            errors.append(e)
+            failed.set()
+
+        with mcp_parser.watch(
+            callback,
+            interval=0.01,
+            debounce=0.01,
+            error_callback=error_callback,
+        ) as watcher:
+            assert isinstance(watcher.latest, mcp.FrozenNamespace)
+            assert watcher.latest == mcp._namespace_from_dict(
+                {"c1": "v1", "c2": "v2"}
+            )
+
+            subscription_changes = queue.Queue()
+            mcp_parser.subscribe("c1", subscription_changes.put)
+            path.write_text('{"c1": "v1a"}')
+            assert subscription_changes.get(timeout=10) == {
+                "c1": ("v1", "v1a")
+            }
+            assert changed.wait(10)
+            assert watcher.latest == mcp._namespace_from_dict(
+                {"c1": "v1a", "c2": "v2"}
+            )
+            assert changes == [watcher.latest]
+
+            path.write_text('{"c1": ')
+            assert failed.wait(10)
+            assert isinstance(errors[0], json.JSONDecodeError)
+            assert watcher.latest.c1 == "v1a"
+        assert not watcher._thread.is_alive()
+    assert len(changes) == 1
+
+
+def test_watch_callback_error():
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c1")
+    d = {"c1": "v1"}
+    mcp_parser.add_source("dict", d)
+    errors = queue.Queue()
+
+    def callback(values):
+        raise RuntimeError(values.c1)
+
+    with mcp_parser.watch(
+        callback, interval=0.01, debounce=0, error_callback=errors.put
+    ) as watcher:
+        d["c1"] = "v1a"
+        assert str(errors.get(timeout=10)) == "v1a"
+        # The watcher keeps running after the callback fails.
+        d["c1"] = "v1b"
+        assert str(errors.get(timeout=10)) == "v1b"
+        assert watcher.latest.c1 == "v1b"
+        assert watcher._thread.is_alive()
+
+
+def test_watch_errors_without_error_callback():
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c1", type=int)
+    d = {"c1": "1"}
+    mcp_parser.add_source("dict", d)
+    errors = queue.Queue()
+    changes = queue.Queue()
+
+    def excepthook(exc_type, exc, tb):
+        errors.put(exc)
+
+    with utm.patch.object(sys, "excepthook", excepthook):
+        with mcp_parser.watch(
+            changes.put, interval=0.01, debounce=0
+        ) as watcher:
+            d["c1"] = "oops"
+            assert isinstance(errors.get(timeout=10), ValueError)
+            assert watcher.latest.c1 == 1
+            d["c1"] = "2"
+            assert changes.get(timeout=10).c1 == 2
+
+
+def test_diff_and_subscribe():
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c1")
+    mcp_parser.add_config("c2", dest="d2")
+    mcp_parser.add_config("c3", type=json.loads)
+    mcp_parser.add_config("c4", default=mcp.SUPPRESS)
+    d = {"c1": "v1", "c2": "v2", "c3": "1"}
+    mcp_parser.add_source("dict", d)
+    old = mcp_parser.parse_config()
+    assert mcp_parser.diff(old, old) == {}
+    assert mcp_parser.diff(None, old) == {
+        "c1": (mcp.NOT_GIVEN, "v1"),
+        "d2": (mcp.NOT_GIVEN, "v2"),
+        "c3": (mcp.NOT_GIVEN, 1),
+    }
+
+    calls = []
+    mcp_parser.subscribe("c1", lambda changes: calls.append(("s1", changes)))
+    s2 = mcp_parser.subscribe(
+        ["c2", "c4"], lambda changes: calls.append(("s2", changes))
+    )
+    mcp_parser.subscribe(
+        ("c1", "c3"), lambda changes: calls.append(("s3", changes))
+    )
+    with pytest.raises(ValueError):
+        mcp_parser.subscribe(["c1", "unknown"], print)
+
+    d.update({"c2": "v2a", "c3": "true", "c4": "v4"})
+    new = mcp_parser.parse_config()
+    changes = mcp_parser.notify_subscribers(old, new)
+    assert changes == {
+        "d2": ("v2", "v2a"),
+        "c3": (1, True),
+        "c4": (mcp.NOT_GIVEN, "v4"),
+    }
+    assert calls == [
+        ("s2", {"d2": ("v2", "v2a"), "c4": (mcp.NOT_GIVEN, "v4")}),
+        ("s3", {"c3": (1, True)}),
+    ]
+
+    calls.clear()
+    mcp_parser.unsubscribe(s2)
+    assert mcp_parser.notify_subscribers(new, old)["c4"] == (
+        "v4",
+        mcp.NOT_GIVEN,
+    )
+    assert calls == [("s3", {"c3": (True, 1)})]
+
+
+def test_subscriber_errors():
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c1", type=json.loads)
+    d = {"c1": "1"}
+    mcp_parser.add_source("dict", d)
+    calls = []
+
+    def failing_callback(changes):
+        raise RuntimeError("s1")
+
+    mcp_parser.subscribe("c1", failing_callback)
+    mcp_parser.subscribe("c1", calls.append)
+    old = mcp_parser.parse_config()
+    d["c1"] = "true"
+    new = mcp_parser.parse_config()
+    with pytest.raises(RuntimeError, match="s1"):
+        mcp_parser.notify_subscribers(old, new)
+    assert calls == [{"c1": (1, True)}]
+    errors = []
+    mcp_parser.notify_subscribers(old, new, error_callback=errors.append)
+    assert len(calls) == 2
+    assert [str(e) for e in errors] == ["s1"]
+
+    # The watcher notices changes of type, and a failing subscriber doesn't
+    # stop the others from being called.
+    d["c1"] = "1"
+    watch_errors = queue.Queue()
+    subscription_changes = queue.Queue()
+    mcp_parser.subscribe("c1", subscription_changes.put)
+    with mcp_parser.watch(
+        interval=0.01, debounce=0, error_callback=watch_errors.put
+    ) as watcher:
+        d["c1"] = "true"
+        assert subscription_changes.get(timeout=10) == {"c1": (1, True)}
+        assert str(watch_errors.get(timeout=10)) == "s1"
+        assert watcher.latest.c1 is True
+
+
+def inotify_available():
+    try:
+        mcp._InotifyNotifier().close()
+    except OSError:
+        return False
+    return True
+
+
+@pytest.mark.skipif(not inotify_available(), reason="inotify not available")
+def test_watch_inotify():
+    # With a long interval, changes are only noticed in time if the watcher
+    # is woken by inotify.
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c1")
+    mcp_parser.add_config("c2")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = pathlib.Path(tmpdir)
+        path = tmpdir / "config.json"
+        path.write_text('{"c1": "v1"}')
+        (tmpdir / "dir").mkdir()
+        mcp_parser.add_source("json", path=path)
+        mcp_parser.add_source("directory", tmpdir / "dir")
+        changes = queue.Queue()
+        with mcp_parser.watch(
+            changes.put, interval=60, debounce=0, backend="inotify"
+        ) as watcher:
+            assert watcher._notifier_timeout is None
+
+            # Replace the file rather than writing to it.
+            new_path = tmpdir / "new_config.json"
+            new_path.write_text('{"c1": "v1a"}')
+            os.replace(new_path, path)
+            assert changes.get(timeout=10).c1 == "v1a"
+
+            new_path.write_text("v2")
+            os.replace(new_path, tmpdir / "dir" / "c2")
+            assert changes.get(timeout=10).c2 == "v2"
+
+
+@pytest.mark.skipif(not inotify_available(), reason="inotify not available")
+def test_watch_inotify_directory_replaced():
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c1")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = pathlib.Path(tmpdir)
+        conf = tmpdir / "conf"
+        conf.mkdir()
+        (conf / "c1").write_text("v1")
+        mcp_parser.add_source("directory", conf)
+        changes = queue.Queue()
+        errors = queue.Queue()
+        with mcp_parser.watch(
+            changes.put,
+            interval=60,
+            debounce=0,
+            error_callback=errors.put,
+            backend="inotify",
+        ) as watcher:
+            assert watcher._notifier_timeout is None
+
+            # Replace the whole directory, like "rm -rf conf && mv conf.new
+            # conf".
+            new_conf = tmpdir / "conf.new"
+            new_conf.mkdir()
+            (new_conf / "c1").write_text("v2")
+            shutil.rmtree(conf)
+            os.rename(new_conf, conf)
+            assert changes.get(timeout=10).c1 == "v2"
+
+            # Changes to the new directory are noticed too.
+            new_path = tmpdir / "c1.new"
+            new_path.write_text("v3")
+            os.replace(new_path, conf / "c1")
+            assert changes.get(timeout=10).c1 == "v3"
+            assert watcher._notifier_timeout is None
+
+
+@pytest.mark.skipif(
+    not os.path.isdir("/proc/self/fd"), reason="needs /proc/self/fd"
+)
+def test_watch_initial_parse_error_closes_notifier():
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c1")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        mcp_parser.add_source(
+            "json", path=pathlib.Path(tmpdir) / "missing.json"
+        )
+        fd_count = len(os.listdir("/proc/self/fd"))
+        for i in range(3):
+            with pytest.raises(FileNotFoundError):
+                mcp_parser.watch()
+        assert len(os.listdir("/proc/self/fd")) == fd_count
+
+
+def test_watch_backends():
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c1")
+    mcp_parser.add_source("dict", {"c1": "v1"})
+    with pytest.raises(ValueError):
+        mcp_parser.watch(backend="unknown")
+    with mcp_parser.watch(backend="poll") as watcher:
+        assert watcher._notifier is None
+    with mcp_parser.watch(interval=0.5) as watcher:
+        # A dict source can't be watched, so it is polled.
+        assert watcher._notifier_timeout == 0.5
+        assert watcher.latest.c1 == "v1"
+
+
+def test_parse_many():
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c1", required=True)
+    mcp_parser.add_config("c2", action="append", default=["d2"])
+    mcp_parser.add_source("dict", {"c1": "ignored"})
+    source_lists = [
+        [{"source": "dict", "values_dict": {"c1": "v1", "c2": "v2"}}],
+        [
+            {"source": "dict", "values_dict": {"c1": "v1a"}, "priority": 1},
+            mcp.DictSource(mcp_parser._actions, {"c1": "v1b", "c2": "v2a"}),
+        ],
+    ]
+    expected = [
+        mcp._namespace_from_dict({"c1": "v1", "c2": ["d2", "v2"]}),
+        mcp._namespace_from_dict({"c1": "v1a", "c2": ["d2", "v2a"]}),
+    ]
+    assert list(mcp_parser.parse_many(source_lists)) == expected
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        assert (
+            list(mcp_parser.parse_many(source_lists, executor=executor))
+            == expected
+        )
+
+    with pytest.raises(mcp.RequiredConfigNotFoundError):
+        list(mcp_parser.parse_many([[]]))
+    assert list(mcp_parser.parse_many([[]], check_required=False)) == [
+        mcp._namespace_from_dict({"c1": None, "c2": ["d2"]})
+    ]
+
+
+def test_parse_many_with_process_pool():
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c1", type=int)
+    source_lists = [
+        [{"source": "dict", "values_dict": {"c1": str(i)}}] for i in range(10)
+    ]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=2) as executor:
+        values = list(
+            mcp_parser.parse_many(
+                source_lists, executor=executor, chunksize=3, frozen=True
+            )
+        )
+    assert values == [mcp._namespace_from_dict({"c1": i}) for i in range(10)]
+
+
+def test_cache_path():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = pathlib.Path(tmpdir)
+        config_path = tmpdir / "config.json"
+        cache_path = tmpdir / "cache"
+        config_path.write_text('{"c1": "v1"}')
+        environ = {"TEST_C2": "v2"}
+
+        def make_parser(c1_type=str, **kwargs):
+            mcp_parser = mcp.ConfigParser(cache_path=str(cache_path), **kwargs)
+            mcp_parser.add_config("c1", type=c1_type)
+            mcp_parser.add_config("c2")
+            mcp_parser.add_source("json", path=str(config_path))
+            mcp_parser.add_source(
+                "environment", env_var_prefix="TEST_", environ=environ
+            )
+            return mcp_parser
+
+        expected = mcp._namespace_from_dict({"c1": "v1", "c2": "v2"})
+        assert make_parser().parse_config() == expected
+        assert cache_path.exists()
+
+        # A warm start doesn't read the sources.
+        with utm.patch.object(
+            mcp.JsonSource, "parse_config", side_effect=AssertionError
+        ):
+            assert make_parser().parse_config() == expected
+            values = make_parser().parse_config(frozen=True)
+            assert isinstance(values, mcp.FrozenNamespace)
+            assert values == expected
+
+        # Changes to the sources or the schema invalidate the cache.
+        environ["TEST_C2"] = "v2a"
+        expected.c2 = "v2a"
+        assert make_parser().parse_config() == expected
+        new_path = tmpdir / "config.json.new"
+        new_path.write_text('{"c1": "v1a", "c2": "v2b"}')
+        os.replace(new_path, config_path)
+        expected.c1 = "v1a"
+        assert make_parser().parse_config() == expected
+        assert make_parser(c1_type=list).parse_config().c1 == list("v1a")
+
+        # Parsers with sources that can't be fingerprinted aren't cached.
+        cache_path.unlink()
+        mcp_parser = make_parser()
+        mcp_parser.add_source("json", fileobj=io.StringIO("{}"))
+        assert mcp_parser.parse_config() == expected
+        assert not cache_path.exists()
+
+        # A corrupt cache is ignored and replaced.
+        cache_path.write_bytes(b"corrupt")
+        assert make_parser().parse_config() == expected
+        with utm.patch.object(
+            mcp.JsonSource, "parse_config", side_effect=AssertionError
+        ):
+            assert make_parser().parse_config() == expected
+
+
+def test_cache_path_functions():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache_path = pathlib.Path(tmpdir) / "cache"
+
+        def parse(type_func):
+            mcp_parser = mcp.ConfigParser(cache_path=str(cache_path))
+            mcp_parser.add_config("c1", type=type_func)
+            mcp_parser.add_source("dict", {"c1": "5"})
+            return mcp_parser.parse_config().c1
+
+        def make_multiplier(factor):
+            return lambda s: int(s) * factor
+
+        assert parse(lambda s: int(s)) == 5
+        assert parse(lambda s: s * 2) == "55"
+        assert parse(lambda s: float(s)) == 5.0
+        assert parse(make_multiplier(2)) == 10
+        assert parse(make_multiplier(3)) == 15
+
+        # The same function gives a cache hit.
+        multiplier = make_multiplier(4)
+        assert parse(multiplier) == 20
+        with utm.patch.object(
+            mcp.DictSource, "parse_config", side_effect=AssertionError
+        ):
+            assert parse(multiplier) == 20
+
+
+def test_cache_path_frozen_values():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache_path = pathlib.Path(tmpdir) / "cache"
+
+        def make_parser():
+            mcp_parser = mcp.ConfigParser(cache_path=str(cache_path))
+            mcp_parser.add_config("c1", type=tuple)
+            mcp_parser.add_config("c2", action="append")
+            mcp_parser.add_source("dict", {"c1": "ab", "c2": "v2"})
+            return mcp_parser
+
+        frozen_values = make_parser().parse_config(frozen=True)
+        assert frozen_values.c2 == ("v2",)
+        # The cached values are the unfrozen ones, whichever kind of parse
+        # stored them.
+        values = make_parser().parse_config()
+        assert values == mcp._namespace_from_dict(
+            {"c1": ("a", "b"), "c2": ["v2"]}
+        )
+        assert make_parser().parse_config(frozen=True) == frozen_values
+
+
 test_specs = []
 
 nargs_test_specs = []
@@ -1465,6 +2531,202 @@ def test_json_source_none_values():
     assert values == mcp._namespace_from_dict({"c": "cv"})
 
 
+def test_json_source_fileobj_parsed_twice():
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c1")
+    fileobj = io.StringIO('{"c1": "v1"}')
+    mcp_parser.add_source("json", fileobj=fileobj)
+    expected = mcp._namespace_from_dict({"c1": "v1"})
+    assert mcp_parser.parse_config() == expected
+    # The file object has been read to the end, so the values read by the
+    # first parse are reused.
+    assert mcp_parser.parse_config() == expected
+
+
+@pytest.mark.parametrize("incremental", (False, True))
+def test_json_source_lazy_loading(incremental):
+    mcp_parser = mcp.ConfigParser(incremental=incremental)
+    mcp_parser.add_config("c1")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = pathlib.Path(tmpdir) / "config.json"
+        decoder = utm.Mock(wraps=json.loads)
+        cached_source = mcp_parser.add_source(
+            "json", path=path, priority=1, decoder=decoder
+        )
+        reread_source = mcp_parser.add_source(
+            "json", path=path, reread=True, decoder=decoder
+        )
+        with pytest.raises(FileNotFoundError):
+            mcp_parser.parse_config()
+
+        path.write_text('{"c1": "v1"}')
+        assert mcp_parser.parse_config() == mcp._namespace_from_dict(
+            {"c1": "v1"}
+        )
+        decoder.reset_mock()
+        mcp_parser.parse_config()
+        assert decoder.call_count == 1
+
+        path.write_text('{"c1": "v1a"}')
+        assert mcp_parser.parse_config() == mcp._namespace_from_dict(
+            {"c1": "v1a"}
+        )
+    assert cached_source.fingerprint() is None
+    assert reread_source.fingerprint() is None
+
+
+def test_json_source_shared_cache():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = pathlib.Path(tmpdir) / "config.json"
+        path.write_text('{"c1": "v1", "c2": "v2"}')
+        decoder = utm.Mock(wraps=json.loads)
+        parsers = []
+        for selective in (False, False, True):
+            mcp_parser = mcp.ConfigParser()
+            mcp_parser.add_config("c1")
+            mcp_parser.add_source(
+                "json", path=path, selective=selective, decoder=decoder
+            )
+            parsers.append(mcp_parser)
+
+        # The selective source decodes just the value of c1.
+        decoder.reset_mock()
+        for mcp_parser in parsers:
+            assert mcp_parser.parse_config().c1 == "v1"
+        assert decoder.call_count == 2
+        path.write_text('{"c1": "v1a"}')
+        for mcp_parser in parsers:
+            assert mcp_parser.parse_config().c1 == "v1a"
+        assert decoder.call_count == 4
+
+        try:
+            mcp.set_json_cache_size(0)
+            path.write_text('{"c1": "v1b"}')
+            for mcp_parser in parsers[:2]:
+                assert mcp_parser.parse_config().c1 == "v1b"
+            assert decoder.call_count == 6
+        finally:
+            mcp.set_json_cache_size(32 * 1024 * 1024)
+
+
+def test_json_source_decoder():
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c1", nargs="?", const="cv1")
+    mcp_parser.add_config("c2")
+    fileobj = io.StringIO('{"c1": "NONE", "c2": "V2"}')
+
+    def decoder(s):
+        return json.loads(s.lower())
+
+    try:
+        mcp.set_json_decoder(decoder)
+        source = mcp_parser.add_source(
+            "json", fileobj=fileobj, json_none_values=['"NONE"']
+        )
+    finally:
+        mcp.set_json_decoder(None)
+    assert mcp_parser.add_source("json", fileobj=io.StringIO("{}"))
+    expected = mcp._namespace_from_dict({"c1": "cv1", "c2": "v2"})
+    assert mcp_parser.parse_config() == expected
+    assert mcp_parser.parse_config() == expected
+    assert source._decoder is decoder
+
+
+def get_json_decoder(name):
+    if name == "json.JSONDecoder":
+        return json.JSONDecoder().decode
+    return pytest.importorskip(name).loads
+
+
+@pytest.mark.parametrize(
+    "decoder_name", ("json", "json.JSONDecoder", "orjson", "simplejson")
+)
+@pytest.mark.parametrize("selective", (False, True))
+def test_json_decoders_large_input(decoder_name, selective):
+    # Compare the results (and, with pytest's --durations option, the speed)
+    # of JSON decoders on a large input.
+    decoder = get_json_decoder(decoder_name)
+    mcp_parser = mcp.ConfigParser()
+    for i in range(100):
+        mcp_parser.add_config(f"c{i}", action="extend", type=int)
+    data = {f"c{i}": list(range(i * 100 + 1)) for i in range(0, 200, 2)}
+    data["other"] = [{"k": "v" * 100, "n": [1.5, None, True]}] * 10000
+    json_str = json.dumps(data)
+    mcp_parser.add_source(
+        "json",
+        fileobj=io.StringIO(json_str),
+        decoder=decoder,
+        selective=selective,
+    )
+    values = mcp_parser.parse_config()
+    assert values == mcp._namespace_from_dict(
+        {f"c{i}": data.get(f"c{i}") for i in range(100)}
+    )
+
+
+def test_decoded_file_cache():
+    cache = mcp._DecodedFileCache(10)
+    cache.put("k1", "v1", 4)
+    cache.put("k2", "v2", 4)
+    assert cache.get("k1") == "v1"
+    cache.put("k3", "v3", 4)
+    assert cache.get("k2") is None
+    assert cache.get("k1") == "v1"
+    cache.put("k4", "v4", 11)
+    assert cache.get("k4") is None
+    cache.set_max_bytes(4)
+    assert cache.get("k3") is None
+    assert cache.get("k1") == "v1"
+
+
+def test_json_source_selective():
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c1")
+    mcp_parser.add_config("c2", nargs="+", type=int)
+    mcp_parser.add_config("c3", action="store_true")
+    mcp_parser.add_config("c4", default="d4")
+    json_str = r"""
+    {
+        "other1": {"a": ["]", "}\"", {"b": [1, 2.5e3, null]}], "c": true},
+        "c\u0031": "v\n1",
+        "other2": "[{",
+        "c2": [1, 2],
+        "other3": -1.5,
+        "c3": null,
+        "other4": [[], {}, false]
+    }
+    """
+    source = mcp_parser.add_source(
+        "json", fileobj=io.StringIO(json_str), selective=True
+    )
+    expected = mcp._namespace_from_dict(
+        {"c1": "v\n1", "c2": [1, 2], "c3": True, "c4": "d4"}
+    )
+    assert mcp_parser.parse_config() == expected
+    decoder = utm.Mock(wraps=json.loads)
+    mcp._decode_json_fields(json_str, source.actions, decoder)
+    decoded = [args[0] for args, kwargs in decoder.call_args_list]
+    assert decoded == ['"v\\n1"', "[1, 2]", "null"]
+
+    for bad_json_str in (
+        '{"c1": "v1",}',
+        '{"c1" "v1"}',
+        '{"other": [1, 2}',
+        '{"other": "a}',
+        '{"c1": "v1"} x',
+        '{"c1": "v1" "c2": 1}',
+        '{"other": }',
+        '{"other": [1, 2,]}',
+        '{"other": tru}',
+    ):
+        with pytest.raises(json.JSONDecodeError):
+            mcp._decode_json_fields(
+                bad_json_str, source.actions, json.loads
+            )
+    assert mcp._decode_json_fields("[1]", {}, json.loads) == [1]
+    assert mcp._decode_json_fields(" {} ", {}, json.loads) == {}
+
+
 # ------------------------------------------------------------------------------
 # environment source tests
 # ------------------------------------------------------------------------------
@@ -1505,6 +2767,147 @@ def test_env_source_force_upper_false():
     assert values == mcp._namespace_from_dict({"c1": None, "c2": "v2"})
 
 
+@pytest.mark.parametrize("extra_env_vars", (0, 10))
+def test_env_source_scan_and_probe(extra_env_vars):
+    # With a small environment, the source scans the environment variables.
+    # With a large one, it looks up each config item's environment variable.
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c1", action="append", dest="c")
+    mcp_parser.add_config("C1", action="append", dest="c")
+    mcp_parser.add_config("c2", nargs=2)
+    mcp_parser.add_config("c3")
+    mcp_parser.add_source("environment", env_var_prefix="TEST_")
+    env = {"TEST_C2": "v2 v2a", "TEST_C1": "v1", "OTHER_C3": "v3"}
+    env.update((f"OTHER_{i}", str(i)) for i in range(extra_env_vars))
+    with utm.patch.object(os, "environ", env):
+        values = mcp_parser.parse_config()
+    assert values == mcp._namespace_from_dict(
+        {"c": ["v1", "v1"], "c2": ["v2", "v2a"], "c3": None}
+    )
+
+
+# ------------------------------------------------------------------------------
+# directory source tests
+# ------------------------------------------------------------------------------
+
+
+def test_directory_source():
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c1")
+    mcp_parser.add_config("c2", nargs="+", type=int)
+    mcp_parser.add_config("c3", action="store_true")
+    mcp_parser.add_config("c4")
+    mcp_parser.add_config("c5", default="d5")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = pathlib.Path(tmpdir)
+        (tmpdir / "c1").write_text(" v1\n")
+        (tmpdir / "c2").write_text("1 2\n")
+        (tmpdir / "c3").write_text("\n")
+        (tmpdir / "c5").mkdir()
+        (tmpdir / "other").write_text("other")
+        (tmpdir / "c4").symlink_to(tmpdir / "missing")
+        mcp_parser.add_source("directory", tmpdir)
+        mcp_parser.add_source(
+            "directory", str(tmpdir), strip=False, none_values=["\n"]
+        )
+        values = mcp_parser.parse_config()
+    assert values == mcp._namespace_from_dict(
+        {"c1": " v1\n", "c2": [1, 2], "c3": True, "c4": None, "c5": "d5"}
+    )
+
+
+@pytest.mark.parametrize("incremental", (False, True))
+def test_directory_source_data_link(incremental):
+    # Lay the directory out like a Kubernetes volume.
+    mcp_parser = mcp.ConfigParser(incremental=incremental)
+    mcp_parser.add_config("c1")
+    mcp_parser.add_config("c2")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = pathlib.Path(tmpdir)
+
+        def write_version(version, values):
+            version_dir = tmpdir / f"..{version}"
+            version_dir.mkdir()
+            for name, value in values.items():
+                (version_dir / name).write_text(value)
+            new_link = tmpdir / "..data_tmp"
+            new_link.symlink_to(version_dir.name)
+            os.replace(new_link, tmpdir / "..data")
+
+        write_version(1, {"c1": "v1", "c2": "v2"})
+        for name in ("c1", "c2"):
+            (tmpdir / name).symlink_to(f"..data/{name}")
+        source = mcp_parser.add_source("directory", tmpdir)
+        assert mcp_parser.parse_config() == mcp._namespace_from_dict(
+            {"c1": "v1", "c2": "v2"}
+        )
+
+        with utm.patch.object(
+            source, "_read_file", wraps=source._read_file
+        ) as read_file:
+            assert mcp_parser.parse_config() == mcp._namespace_from_dict(
+                {"c1": "v1", "c2": "v2"}
+            )
+            assert read_file.call_count == 0
+
+            write_version(2, {"c1": "v1a"})
+            assert mcp_parser.parse_config() == mcp._namespace_from_dict(
+                {"c1": "v1a", "c2": None}
+            )
+            assert read_file.call_count == 1
+
+
+class ListedDirectory:
+    # Stands in for the result of os.scandir().
+
+    def __init__(self, entries):
+        self.entries = entries
+
+    def __enter__(self):
+        return iter(self.entries)
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+def test_directory_source_data_link_changed_during_parse():
+    mcp_parser = mcp.ConfigParser()
+    mcp_parser.add_config("c1", default="DEFAULT")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = pathlib.Path(tmpdir)
+        for version, value in ((1, "v1"), (2, "v2")):
+            (tmpdir / f"..{version}").mkdir()
+            (tmpdir / f"..{version}" / "c1").write_text(value)
+        (tmpdir / "..data").symlink_to("..1")
+        (tmpdir / "c1").symlink_to("..data/c1")
+        mcp_parser.add_source("directory", tmpdir)
+
+        scandir = os.scandir
+        swaps = []
+
+        def swap_data_link():
+            new_link = tmpdir / "..data_tmp"
+            new_link.symlink_to("..2")
+            os.replace(new_link, tmpdir / "..data")
+            shutil.rmtree(tmpdir / "..1")
+
+        def scandir_then_swap(path):
+            # Change the ..data link after the old version directory has been
+            # listed but before its files have been looked at.
+            with scandir(path) as it:
+                entries = list(it)
+            if swaps:
+                swaps.pop()()
+            return ListedDirectory(entries)
+
+        swaps.append(swap_data_link)
+        with utm.patch.object(os, "scandir", scandir_then_swap):
+            assert mcp_parser.parse_config() == mcp._namespace_from_dict(
+                {"c1": "v2"}
+            )
+        assert not swaps
+
+
 # ------------------------------------------------------------------------------
 # dict source tests
 # ------------------------------------------------------------------------------
@@ -1631,3 +3034,21 @@ def test_has_nonnone_attr():
     assert mcp._has_nonnone_attr(obj, "c2")
     assert not mcp._has_nonnone_attr(obj, "c3")
     assert not mcp._has_nonnone_attr(obj, "c4")
+
+
+def test_mapped_file():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = pathlib.Path(tmpdir) / "file.json"
+        path.write_bytes('{"c1": "é"}'.encode("utf-8"))
+        with mcp.mapped_file(path) as view:
+            assert view.readonly
+            assert str(view, "utf-8") == '{"c1": "é"}'
+
+        mcp_parser = mcp.ConfigParser()
+        mcp_parser.add_config("c1")
+        mcp_parser.add_source("json", path=path)
+        assert mcp_parser.parse_config().c1 == "é"
+
+        path.write_bytes(b"")
+        with mcp.mapped_file(path) as view:
+            assert view.tobytes() == b""